@@ -0,0 +1,120 @@
+"""로스팅 리포트 일괄 생성 (Streamlit 없이 실행).
+
+    python ikawa_batch.py <로그 폴더> -o reports -j 8
+
+폴더 안의 로그 파일(CSV, Parquet)마다 포인트별 분석 표(온도 포인트 + 보간된 팬, 팬 포인트 + 보간된
+온도/ROR), 요약 지표(JSON), 그래프 이미지를 만들고 전체 요약을 summary.csv 로 모은다. 파일은 프로세스
+풀에서 병렬로 처리한다. png/svg 이미지는 kaleido 가 있어야 만들 수 있고, 없으면 html 로 저장한 뒤 경고한다.
+"""
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import plotly.express as px
+
+from profile_engine import ROR_COLUMNS, ROR_COL, ROR_WINDOW_COL, ROR_SAVGOL_COL, ROR_EMA_COL, add_smoothed_ror, point_analysis, profile_summary
+from profile_import import TIME_UNITS, TEMP_UNITS, read_roast_log
+from profile_plot import DEFAULT_AXIS_RANGES, build_profile_figure
+
+LOG_PATTERNS = ('*.csv', '*.parquet')
+IMAGE_FORMATS = ('png', 'svg', 'html', 'none')
+STATIC_IMAGE_FORMATS = ('png', 'svg')
+DEFAULT_IMAGE_FORMAT = 'png' if importlib.util.find_spec('kaleido') else 'html'
+ROR_CHOICES = {'raw': ROR_COL, 'window': ROR_WINDOW_COL, 'savgol': ROR_SAVGOL_COL, 'ema': ROR_EMA_COL}
+POINT_COLUMNS = ['온도', 'Fan (%)', '분', '초', '구간 시간 (초)', '누적 시간 (초)', *ROR_COLUMNS]
+CSV_ENCODING = 'utf-8-sig'  # 엑셀에서 한글 컬럼 이름이 깨지지 않도록 BOM 포함
+
+
+def _json_value(value):
+    # numpy 스칼라 → 파이썬 값, NaN → null
+    if hasattr(value, 'item'): value = value.item()
+    return None if isinstance(value, float) and pd.isna(value) else value
+
+def write_figure(fig, path_without_ext, image_format):
+    # 반환: 실제로 쓴 파일 경로. png/svg 는 kaleido 가 필요하며 없으면 html 로 대신 저장
+    if image_format == 'none': return None
+    if image_format != 'html':
+        try:
+            fig.write_image(f"{path_without_ext}.{image_format}")
+            return f"{path_without_ext}.{image_format}"
+        except (ImportError, ValueError, RuntimeError):
+            pass
+    fig.write_html(f"{path_without_ext}.html", include_plotlyjs='cdn')
+    return f"{path_without_ext}.html"
+
+def process_file(path, output_dir, read_options, image_format, ror_col):
+    # 로그 하나 → 리포트 파일들. 반환: 요약 dict (실패하면 error 항목 포함)
+    name = os.path.splitext(os.path.basename(path))[0]
+    summary = {'name': name, 'source': path}
+    try:
+        profile_df, fan_df = read_roast_log(path, **read_options)
+        profile_df = add_smoothed_ror([profile_df])[0]
+        temp_points_df, fan_points_df = point_analysis(profile_df, fan_df, ror_col)
+        prefix = os.path.join(output_dir, name)
+        temp_points_df.reindex(columns=[col for col in POINT_COLUMNS if col in temp_points_df]).to_csv(f"{prefix}_temp_points.csv", index=False, encoding=CSV_ENCODING)
+        fan_points_df.reindex(columns=[col for col in POINT_COLUMNS if col in fan_points_df]).to_csv(f"{prefix}_fan_points.csv", index=False, encoding=CSV_ENCODING)
+        summary.update(profile_summary(profile_df, fan_df))
+        axis_ranges = dict(DEFAULT_AXIS_RANGES, x=[0, max(DEFAULT_AXIS_RANGES['x'][1], summary['total_time'] if pd.notna(summary['total_time']) else 0)])
+        fig = build_profile_figure({name: profile_df}, {name: fan_df}, [name], {name: px.colors.qualitative.Plotly[0]}, axis_ranges, ror_col=ror_col)
+        summary['chart'] = write_figure(fig, prefix, image_format)
+        with open(f"{prefix}_summary.json", 'w', encoding='utf-8') as f:
+            json.dump({key: _json_value(value) for key, value in summary.items()}, f, ensure_ascii=False, indent=2)
+    except (ValueError, ImportError, OSError, pd.errors.ParserError) as e:
+        summary['error'] = str(e)
+    return summary
+
+def find_logs(input_dir, patterns=LOG_PATTERNS):
+    return sorted({path for pattern in patterns for path in glob.glob(os.path.join(input_dir, pattern))})
+
+def run_batch(paths, output_dir, read_options=None, image_format=DEFAULT_IMAGE_FORMAT, ror_col=ROR_SAVGOL_COL, jobs=None):
+    # 반환: 전체 요약 DataFrame (summary.csv 로도 저장)
+    os.makedirs(output_dir, exist_ok=True)
+    args = [(path, output_dir, read_options or {}, image_format, ror_col) for path in paths]
+    if jobs == 1:
+        summaries = [process_file(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            summaries = list(executor.map(process_file, *zip(*args))) if args else []
+    summary_df = pd.DataFrame(summaries)
+    summary_df.to_csv(os.path.join(output_dir, 'summary.csv'), index=False, encoding=CSV_ENCODING)
+    return summary_df
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ikawa 로스팅 로그 폴더의 리포트를 일괄 생성합니다.")
+    parser.add_argument('input_dir', help="로그 파일(CSV, Parquet)이 있는 폴더")
+    parser.add_argument('-o', '--output-dir', default='reports', help="리포트를 저장할 폴더 (기본: reports)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="병렬 프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--pattern', action='append', help="파일 패턴 (여러 번 지정 가능, 기본: *.csv, *.parquet)")
+    parser.add_argument('--time-unit', choices=list(TIME_UNITS), default='s')
+    parser.add_argument('--temp-unit', choices=list(TEMP_UNITS), default='C')
+    parser.add_argument('--time-col', help="시간 컬럼 이름 (기본: 자동 인식)")
+    parser.add_argument('--temp-col', help="온도 컬럼 이름 (기본: 자동 인식)")
+    parser.add_argument('--fan-col', help="팬 컬럼 이름 (기본: 자동 인식)")
+    parser.add_argument('--image-format', choices=IMAGE_FORMATS, default=DEFAULT_IMAGE_FORMAT,
+                        help=f"그래프 이미지 형식 (기본: {DEFAULT_IMAGE_FORMAT}). png/svg 는 kaleido 가 필요하며, 만들 수 없으면 html 로 저장")
+    parser.add_argument('--ror', choices=list(ROR_CHOICES), default='savgol', help="그래프 보조축에 그릴 ROR")
+    args = parser.parse_args(argv)
+
+    paths = find_logs(args.input_dir, args.pattern or LOG_PATTERNS)
+    if not paths:
+        print(f"{args.input_dir} 에서 로그 파일을 찾지 못했습니다.", file=sys.stderr); return 1
+    read_options = {'column_map': {'time': args.time_col, 'temp': args.temp_col, 'fan': args.fan_col}, 'time_unit': args.time_unit, 'temp_unit': args.temp_unit}
+    summary_df = run_batch(paths, args.output_dir, read_options, args.image_format, ROR_CHOICES[args.ror], args.jobs)
+    failed = summary_df[summary_df['error'].notna()] if 'error' in summary_df else summary_df.iloc[:0]
+    for _, row in failed.iterrows():
+        print(f"실패: {row['source']}: {row['error']}", file=sys.stderr)
+    if args.image_format in STATIC_IMAGE_FORMATS and 'chart' in summary_df:
+        n_html = summary_df['chart'].dropna().str.endswith('.html').sum()
+        if n_html:
+            print(f"경고: {n_html}개 그래프를 {args.image_format} 대신 html 로 저장했습니다. 이미지로 저장하려면 kaleido 를 설치하세요 (pip install kaleido).", file=sys.stderr)
+    print(f"{len(summary_df) - len(failed)}/{len(summary_df)}개 처리 완료 → {os.path.join(args.output_dir, 'summary.csv')}")
+    return 1 if len(failed) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""합성 로스팅 프로파일로 엔진/그래프 성능 측정 (Streamlit 없이 실행).
+
+    python ikawa_bench.py --profiles 1 10 50 --points 20 200 2000 --repeat 5 --csv bench.csv
+
+프로파일 수 × 포인트 수 조합마다 팬 데이터가 있을 때와 없을 때의 합성 프로파일을 만들고 동기화, ROR,
+스무딩 ROR, 시간 그리드, 포인트별 분석, 그래프 생성, 캐시 적중 시간을 잰다. rows 는 실제로 만든 온도 포인트
+수(프로파일 합)이고, 포인트가 DEFAULT_PIXEL_BUDGET 보다 많으면 그래프 생성에 LTTB 다운샘플링이 포함된다.
+시간은 반복 중 최소값이고, --memory 를 주면 tracemalloc 으로 단계별 최대 메모리도 잰다 (시간이 늘어나므로
+따로 측정하는 편이 낫다).
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from profile_cache import ProfileCache, profile_key
+from profile_engine import TIME_INPUT_MODE, TEMP_COL, FAN_COL, MIN_COL, SEC_COL, INTERVAL_COL, CUMULATIVE_COL, ROR_COL, ROR_SAVGOL_COL
+from profile_engine import sync_profiles, calculate_ror_batch, add_smoothed_ror, build_time_grid, point_analysis
+from profile_plot import DEFAULT_AXIS_RANGES, build_profile_figure
+from profile_timing import StageTimer, stop_memory_tracking
+
+ROAST_SECONDS = 600
+FAN_POINTS = 12
+
+
+def synthetic_profile(n_points, rng, value_col=TEMP_COL, duration=ROAST_SECONDS):
+    # 분/초만 채운 시간 입력 방식의 편집기 데이터 (동기화 전, 온도 프로파일은 ROR 컬럼 포함)
+    # 정확히 n_points 개, 시간은 0 부터 duration 까지 간격의 ±40% 로 흔들어 순서를 유지한 채 불규칙하게
+    times = np.linspace(0, duration, n_points)
+    if n_points > 2: times[1:-1] += rng.uniform(-0.4, 0.4, n_points - 2) * duration / (n_points - 1)
+    if value_col == TEMP_COL:
+        values = 200 - 110 * np.exp(-times / 240) + rng.normal(0, 0.3, len(times))
+    else:
+        values = rng.uniform(60, 90, len(times)).round()
+    df = pd.DataFrame({value_col: values, MIN_COL: times // 60, SEC_COL: times % 60, INTERVAL_COL: np.nan, CUMULATIVE_COL: np.nan})
+    return df.assign(**{ROR_COL: np.nan}) if value_col == TEMP_COL else df
+
+def synthetic_profiles(n_profiles, n_points, with_fan, seed=0):
+    # 반환: (온도 편집기 데이터 목록, 팬 편집기 데이터 목록). 팬이 없으면 빈 팬 데이터
+    rng = np.random.default_rng(seed)
+    temp_dfs = [synthetic_profile(n_points, rng) for _ in range(n_profiles)]
+    fan_dfs = [synthetic_profile(FAN_POINTS, rng, FAN_COL) if with_fan else synthetic_profile(0, rng, FAN_COL) for _ in range(n_profiles)]
+    return temp_dfs, fan_dfs
+
+def run_case(n_profiles, n_points, with_fan, repeat=3, track_memory=False):
+    # 반환: 단계별 측정 결과 DataFrame (반복 중 최소 시간, 최대 메모리)
+    temp_dfs, fan_dfs = synthetic_profiles(n_profiles, n_points, with_fan)
+    modes = [TIME_INPUT_MODE] * n_profiles
+    names = [f"프로파일 {i + 1}" for i in range(n_profiles)]
+    color_map = {name: px.colors.qualitative.Plotly[i % len(px.colors.qualitative.Plotly)] for i, name in enumerate(names)}
+    timer = StageTimer(track_memory=track_memory)
+    for _ in range(repeat):
+        with timer.stage('sync_profiles (온도)'): profiles = sync_profiles(temp_dfs, modes)
+        with timer.stage('sync_profiles (팬)'): fan_profiles = sync_profiles(fan_dfs, modes, FAN_COL, with_ror=False)
+        with timer.stage('calculate_ror_batch'): profiles = calculate_ror_batch(profiles)
+        with timer.stage('add_smoothed_ror'): profiles = add_smoothed_ror(profiles)
+        profile_map, fan_map = dict(zip(names, profiles)), dict(zip(names, fan_profiles))
+        with timer.stage('build_time_grid'): build_time_grid(profile_map, fan_map)
+        with timer.stage('point_analysis'):
+            for name in names: point_analysis(profile_map[name], fan_map[name])
+        with timer.stage('build_profile_figure'):
+            build_profile_figure(profile_map, fan_map, names, color_map, dict(DEFAULT_AXIS_RANGES, x=[0, ROAST_SECONDS]), ror_col=ROR_SAVGOL_COL)
+        cache = ProfileCache()
+        keys = [profile_key(df, mode) for df, mode in zip(temp_dfs, modes)]
+        cache.get_many(keys, temp_dfs, lambda dfs: calculate_ror_batch(sync_profiles(dfs, modes[:len(dfs)])))
+        with timer.stage('profile_key + 캐시 적중'):
+            cache.get_many([profile_key(df, mode) for df, mode in zip(temp_dfs, modes)], temp_dfs, lambda dfs: [])
+    if track_memory: stop_memory_tracking()
+    frame = timer.to_frame()
+    result = frame.groupby('stage', sort=False).agg(min_ms=('seconds', 'min'), peak_mb=('peak_mb', 'max')).reset_index()
+    result['min_ms'] *= 1000
+    rows = sum(len(df) for df in temp_dfs)  # 실제로 만든 온도 포인트 수 (전체 프로파일 합)
+    return result.assign(profiles=n_profiles, points=n_points, rows=rows, fan=with_fan)[['profiles', 'points', 'rows', 'fan', 'stage', 'min_ms', 'peak_mb']]
+
+def run_benchmarks(profile_counts, point_counts, repeat=3, track_memory=False):
+    results = [run_case(n_profiles, n_points, with_fan, repeat, track_memory)
+               for n_profiles in profile_counts for n_points in point_counts for with_fan in (True, False)]
+    return pd.concat(results, ignore_index=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="합성 로스팅 프로파일로 엔진/그래프 처리 시간을 측정합니다.")
+    parser.add_argument('--profiles', type=int, nargs='+', default=[1, 10, 50], help="프로파일 수 (여러 개 지정 가능)")
+    parser.add_argument('--points', type=int, nargs='+', default=[20, 200, 2000], help="프로파일당 온도 포인트 수 (여러 개 지정 가능)")
+    parser.add_argument('--repeat', type=int, default=3, help="조합마다 반복 횟수 (최소 시간을 기록)")
+    parser.add_argument('--memory', action='store_true', help="단계별 최대 메모리도 측정 (느려짐)")
+    parser.add_argument('--csv', help="결과를 CSV 로 저장할 경로")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.profiles, args.points, args.repeat, args.memory)
+    if not args.memory: results = results.drop(columns='peak_mb')
+    with pd.option_context('display.max_rows', None, 'display.width', 200, 'display.float_format', '{:.2f}'.format):
+        print(results.to_string(index=False))
+    if args.csv: results.to_csv(args.csv, index=False, encoding='utf-8-sig')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
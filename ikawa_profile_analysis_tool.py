@@ -1,9 +1,16 @@
+import os
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import plotly.express as px
+from profile_engine import TIME_INPUT_MODE, TEMP_COL, FAN_COL, ROR_COLUMNS, sync_profiles, calculate_ror_batch, add_smoothed_ror, point_analysis, build_time_grid, grid_value
+from profile_cache import ProfileCache, profile_key
+from profile_import import TIME_UNITS, TEMP_UNITS, read_roast_logs
+from profile_library import ProfileLibrary
+from profile_search import RoastSearchIndex, profile_features
+from profile_timing import TRACK_MEMORY, StageTimer, enable_log_output
+from profile_plot import RENDER_MODES, DEFAULT_PIXEL_BUDGET, DEFAULT_AXIS_RANGES, build_profile_figure, set_time_marker
 
 # --- 백엔드 함수 ---
 def create_new_profile():
@@ -17,52 +24,71 @@ def create_new_fan_profile():
     return df
 
 def sync_profile_data(df, primary_input_mode):
-    df = df.reset_index(drop=True); df['Point'] = df.index
-    if df['온도'].isnull().all(): return df
-    last_valid_index = df['온도'].last_valid_index();
-    if last_valid_index is None: return df
-    calc_df = df.loc[0:last_valid_index].copy()
-    if primary_input_mode == '시간 입력':
-        calc_df['누적 시간 (초)'] = calc_df['분'].fillna(0) * 60 + calc_df['초'].fillna(0)
-        calc_df['구간 시간 (초)'] = calc_df['누적 시간 (초)'].diff().shift(-1)
-    elif primary_input_mode == '구간 입력':
-        cumulative_seconds = calc_df['구간 시간 (초)'].fillna(0).cumsum()
-        calc_df['누적 시간 (초)'] = np.concatenate(([0], cumulative_seconds[:-1].values))
-        calc_df['분'] = (calc_df['누적 시간 (초)'] // 60).astype(int)
-        calc_df['초'] = (calc_df['누적 시간 (초)'] % 60).astype(int)
-    delta_temp = calc_df['온도'].diff(); delta_time = calc_df['누적 시간 (초)'].diff()
-    ror = (delta_temp / delta_time).replace([np.inf, -np.inf], 0).fillna(0)
-    calc_df['ROR (℃/sec)'] = ror; df.update(calc_df)
-    return df
+    return sync_profiles([df], [primary_input_mode], TEMP_COL)[0]
 
 def sync_fan_data(df, primary_input_mode):
-    df = df.reset_index(drop=True); df['Point'] = df.index
-    if df['Fan (%)'].isnull().all(): return df
-    last_valid_index = df['Fan (%)'].last_valid_index()
-    if last_valid_index is None: return df
-    calc_df = df.loc[0:last_valid_index].copy()
-    if primary_input_mode == '시간 입력':
-        calc_df['누적 시간 (초)'] = calc_df['분'].fillna(0) * 60 + calc_df['초'].fillna(0)
-        calc_df['구간 시간 (초)'] = calc_df['누적 시간 (초)'].diff().shift(-1)
-    elif primary_input_mode == '구간 입력':
-        cumulative_seconds = calc_df['구간 시간 (초)'].fillna(0).cumsum()
-        calc_df['누적 시간 (초)'] = np.concatenate(([0], cumulative_seconds[:-1].values))
-        calc_df['분'] = (calc_df['누적 시간 (초)'] // 60).astype(int)
-        calc_df['초'] = (calc_df['누적 시간 (초)'] % 60).astype(int)
-    df.update(calc_df)
-    return df
+    return sync_profiles([df], [primary_input_mode], FAN_COL, with_ror=False)[0]
 
 def calculate_ror(df):
-    if df['온도'].isnull().all(): return df
-    last_valid_index = df['온도'].last_valid_index()
-    if last_valid_index is None: return df
-    calc_df = df.loc[0:last_valid_index].copy()
-    delta_temp = calc_df['온도'].diff(); delta_time = calc_df['누적 시간 (초)'].diff()
-    ror = (delta_temp / delta_time).replace([np.inf, -np.inf], 0).fillna(0)
-    calc_df['ROR (℃/sec)'] = ror; df.update(calc_df)
-    return df
+    return calculate_ror_batch([df])[0]
+
+@st.cache_resource
+def get_processing_cache():
+    # 세션 간 공유: 같은 입력이면 다른 세션에서 계산한 결과를 재사용
+    return ProfileCache(maxsize=512)
+
+def process_profiles(profiles, fan_profiles, input_modes, ror_states=None):
+    # 내용이 바뀐 프로파일만 다시 계산. 반환: (처리된 온도, 처리된 팬, 이름별 (온도 키, 팬 키))
+    # ror_states: 이름별 스무딩 ROR 상태. 포인트를 뒤에 추가한 프로파일은 추가된 부분만 계산한다
+    names = list(profiles.keys())
+    ror_states = ror_states if ror_states is not None else {}
+    for name in set(ror_states) - set(names): del ror_states[name]
+    def compute(items):
+        item_names, dfs = zip(*items)
+        states = [ror_states.get(name) for name in item_names]
+        results = add_smoothed_ror(calculate_ror_batch(dfs), states)
+        ror_states.update(zip(item_names, states))
+        return results
+    temp_keys = [profile_key(profiles[name], input_modes.get(name)) for name in names]
+    processed = get_processing_cache().get_many(temp_keys, [(name, profiles[name]) for name in names], compute)
+    fan_keys = {name: profile_key(df, input_modes.get(name)) for name, df in fan_profiles.items()}
+    keys = {name: (temp_key, fan_keys.get(name)) for name, temp_key in zip(names, temp_keys)}
+    return dict(zip(names, processed)), dict(fan_profiles), keys
+
+@st.cache_resource
+def get_profile_library():
+    return ProfileLibrary()
+
+@st.cache_resource
+def get_search_index():
+    return RoastSearchIndex(os.path.join(get_profile_library().root, 'search_index.npz'))
+
+def timed(stage_name):
+    # 성능 디버그가 켜져 있으면 단계 시간을 기록 (꺼져 있으면 아무것도 하지 않음)
+    return st.session_state.stage_timer.stage(stage_name)
+
+def update_processed_profiles(selected_names=None):
+    # '그래프 업데이트' 처리. selected_names 가 없으면 온도 데이터가 있는 프로파일을 모두 선택
+    if selected_names is None:
+        selected_names = [name for name, df in st.session_state.profiles.items() if not df['온도'].dropna().empty]
+    if selected_names:
+        st.session_state.selected_profiles = selected_names
+    input_modes = {name: st.session_state.get(f"main_input_{name}", TIME_INPUT_MODE) for name in st.session_state.profiles}
+    with timed("프로파일 처리"):
+        st.session_state.processed_profiles, st.session_state.processed_fan_profiles, st.session_state.processed_keys = process_profiles(st.session_state.profiles, st.session_state.fan_profiles, input_modes, st.session_state.ror_states)
+    with timed("시간 그리드"):
+        st.session_state.time_grid = build_time_grid(st.session_state.processed_profiles, st.session_state.processed_fan_profiles)
+    st.session_state.selected_time = 0
+    st.session_state.graph_button_enabled = True
+
+def unique_profile_name(base_name, existing_names):
+    if base_name not in existing_names: return base_name
+    suffix = 2
+    while f"{base_name} ({suffix})" in existing_names: suffix += 1
+    return f"{base_name} ({suffix})"
 
 # --- UI 및 앱 실행 로직 ---
+PROFILES_PER_ROW = 5
 st.set_page_config(layout="wide")
 st.title('☕ Ikawa Profile Analysis Tool')
 st.markdown("**(v.1.0 2025.10.13)**")
@@ -73,9 +99,17 @@ if 'fan_profiles' not in st.session_state:
     st.session_state.fan_profiles = {name: create_new_fan_profile() for name in st.session_state.profiles.keys()}
 if 'processed_profiles' not in st.session_state: st.session_state.processed_profiles = None
 if 'processed_fan_profiles' not in st.session_state: st.session_state.processed_fan_profiles = None
+if 'processed_keys' not in st.session_state: st.session_state.processed_keys = {}
+if 'time_grid' not in st.session_state: st.session_state.time_grid = None
+if 'ror_states' not in st.session_state: st.session_state.ror_states = {}
+if 'trace_cache' not in st.session_state: st.session_state.trace_cache = ProfileCache(maxsize=256)
 if 'graph_button_enabled' not in st.session_state: st.session_state.graph_button_enabled = False
 if 'selected_time' not in st.session_state: st.session_state.selected_time = 0
 
+debug_timing = st.session_state.get('debug_timing', False)
+st.session_state.stage_timer = StageTimer(enabled=debug_timing, track_memory=debug_timing and TRACK_MEMORY)
+if debug_timing: enable_log_output()
+
 with st.sidebar:
     st.header("⚙️ 보기 옵션")
     profile_names_sidebar = list(st.session_state.profiles.keys())
@@ -95,136 +129,196 @@ with st.sidebar:
         y2_max = st.number_input("보조Y축(ROR) 최대값", value=0.75, format="%.2f")
     st.session_state.axis_ranges = {'x': [x_min, x_max], 'y': [y_min, y_max], 'y2': [y2_min, y2_max]}
 
+    st.subheader("렌더링")
+    render_mode_labels = {'auto': "자동", 'svg': "SVG", 'webgl': "WebGL"}
+    st.session_state.render_mode = st.selectbox("그래프 렌더링 방식", RENDER_MODES, format_func=render_mode_labels.get)
+    st.session_state.pixel_budget = st.number_input("트레이스당 최대 포인트 수", min_value=100, value=DEFAULT_PIXEL_BUDGET, step=100)
+    st.session_state.ror_col = st.selectbox("ROR 계산 방식", list(ROR_COLUMNS.keys()), format_func=ROR_COLUMNS.get)
+
+    st.subheader("개발자 옵션")
+    st.checkbox("🐞 성능 디버그 (단계별 실행 시간)", key="debug_timing")
+
 st.subheader("프로파일 관리")
-if len(st.session_state.profiles) < 10:
-    if st.button("＋ 새 프로파일 추가"):
-        existing_nums = [int(name.split(' ')[1]) for name in st.session_state.profiles.keys() if name.startswith("프로파일 ") and name.split(' ')[1].isdigit()]
-        new_profile_num = max(existing_nums) + 1 if existing_nums else 1
-        new_name = f"프로파일 {new_profile_num}"; st.session_state.profiles[new_name] = create_new_profile(); st.session_state.fan_profiles[new_name] = create_new_fan_profile(); st.rerun()
-else: st.warning("최대 10개의 프로파일까지 추가할 수 있습니다.")
+if st.button("＋ 새 프로파일 추가"):
+    existing_nums = [int(name.split(' ')[1]) for name in st.session_state.profiles.keys() if name.startswith("프로파일 ") and name.split(' ')[1].isdigit()]
+    new_profile_num = max(existing_nums) + 1 if existing_nums else 1
+    new_name = f"프로파일 {new_profile_num}"; st.session_state.profiles[new_name] = create_new_profile(); st.session_state.fan_profiles[new_name] = create_new_fan_profile(); st.rerun()
+with st.expander("📂 로그 파일 가져오기 (CSV / Parquet)"):
+    uploaded_files = st.file_uploader("로스팅 로그 파일", type=["csv", "parquet"], accept_multiple_files=True, key="log_uploader")
+    col1, col2 = st.columns(2)
+    with col1: log_time_unit = st.selectbox("시간 단위", list(TIME_UNITS.keys()), key="log_time_unit")
+    with col2: log_temp_unit = st.selectbox("온도 단위", TEMP_UNITS, key="log_temp_unit")
+    st.caption("컬럼 이름 (비워두면 자동 인식)")
+    col1, col2, col3 = st.columns(3)
+    with col1: log_time_col = st.text_input("시간 컬럼", key="log_time_col")
+    with col2: log_temp_col = st.text_input("온도 컬럼", key="log_temp_col")
+    with col3: log_fan_col = st.text_input("팬 컬럼", key="log_fan_col")
+    if st.button("📥 가져오기", disabled=not uploaded_files):
+        column_map = {'time': log_time_col, 'temp': log_temp_col, 'fan': log_fan_col}
+        results = read_roast_logs(uploaded_files, column_map=column_map, time_unit=log_time_unit, temp_unit=log_temp_unit)
+        import_failed = False
+        for uploaded_file, result in zip(uploaded_files, results):
+            if isinstance(result, Exception):
+                st.error(f"{uploaded_file.name}: {result}"); import_failed = True; continue
+            new_name = unique_profile_name(os.path.splitext(uploaded_file.name)[0], st.session_state.profiles)
+            st.session_state.profiles[new_name], st.session_state.fan_profiles[new_name] = result
+            st.session_state.graph_button_enabled = True
+        if not import_failed: st.rerun()
+with st.expander("📚 로스팅 라이브러리"):
+    library = get_profile_library()
+    st.write("**프로파일 저장** (동기화된 데이터 기준)")
+    col1, col2, col3 = st.columns(3)
+    with col1: save_name = st.selectbox("저장할 프로파일", list(st.session_state.profiles.keys()), key="library_save_name")
+    with col2: save_bean = st.text_input("원두", key="library_save_bean")
+    with col3: save_date = st.date_input("로스팅 날짜", key="library_save_date")
+    if st.button("💾 라이브러리에 저장", disabled=save_name is None):
+        try:
+            library.save(save_name, st.session_state.profiles[save_name], st.session_state.fan_profiles.get(save_name), bean=save_bean, date=save_date)
+            st.success(f"'{save_name}' 저장 완료")
+        except ValueError as e: st.error(str(e))
+
+    st.write("**라이브러리 검색**")
+    col1, col2 = st.columns([0.6, 0.4])
+    with col1: search_text = st.text_input("이름/원두 검색", key="library_search_text")
+    with col2: search_beans = st.multiselect("원두", sorted(library.index()['bean'].dropna().unique()), key="library_search_beans")
+    library_results = library.search(search_text, search_beans).reset_index(drop=True)
+    library_column_config = {"name": "이름", "date": "날짜", "bean": "원두", "total_time": st.column_config.NumberColumn("총 시간(초)", format="%.0f"), "charge_temp": st.column_config.NumberColumn("투입 온도", format="%.1f"), "drop_temp": st.column_config.NumberColumn("배출 온도", format="%.1f"), "has_fan": "팬"}
+    library_table = st.dataframe(library_results, column_config=library_column_config, column_order=list(library_column_config.keys()), hide_index=True, use_container_width=True, on_select="rerun", selection_mode="multi-row", key="library_table")
+    selected_roast_ids = library_results.loc[library_table.selection.rows, 'roast_id'].tolist()
+    st.caption(f"전체 {len(library.index())}개 중 {len(library_results)}개 표시, {len(selected_roast_ids)}개 선택")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("📈 선택한 로스팅 불러오기", disabled=not selected_roast_ids):
+            for roast_id, roast_name in library_results.set_index('roast_id').loc[selected_roast_ids, 'name'].items():
+                new_name = unique_profile_name(roast_name, st.session_state.profiles)
+                st.session_state.profiles[new_name], st.session_state.fan_profiles[new_name] = library.load(roast_id)
+            st.session_state.graph_button_enabled = True; st.rerun()
+    with col2:
+        if st.button("🗑️ 선택한 로스팅 삭제", disabled=not selected_roast_ids):
+            for roast_id in selected_roast_ids: library.delete(roast_id)
+            st.rerun()
+with st.expander("🔎 유사 로스팅 찾기"):
+    library, search_index = get_profile_library(), get_search_index()
+    col1, col2, col3 = st.columns([0.5, 0.25, 0.25])
+    with col1: similar_query_name = st.selectbox("기준 프로파일 (동기화된 데이터 기준)", list(st.session_state.profiles.keys()), key="similar_query_name")
+    with col2: similar_k = st.number_input("찾을 개수", min_value=1, max_value=20, value=5, key="similar_k")
+    with col3: similar_dtw = st.checkbox("DTW로 재정렬", key="similar_dtw")
+    if st.button("🔎 유사 로스팅 찾기", disabled=similar_query_name is None):
+        try:
+            search_index.sync(library)
+            similar_results = search_index.query(profile_features(st.session_state.profiles[similar_query_name]), k=similar_k, rerank_dtw=similar_dtw)
+            st.session_state.similar_roasts = (similar_query_name, similar_results.merge(library.index(), on='roast_id'))
+        except ValueError as e: st.error(str(e))
+    if st.session_state.get('similar_roasts'):
+        similar_query_name, similar_roasts = st.session_state.similar_roasts
+        similar_column_config = {"name": "이름", "date": "날짜", "bean": "원두", "distance": st.column_config.NumberColumn("거리", format="%.1f"), "dtw_distance": st.column_config.NumberColumn("DTW 거리", format="%.1f"), "total_time": st.column_config.NumberColumn("총 시간(초)", format="%.0f")}
+        st.write(f"**{similar_query_name}** 와 가장 비슷한 로스팅")
+        st.dataframe(similar_roasts, column_config=similar_column_config, column_order=[col for col in similar_column_config if col in similar_roasts.columns], hide_index=True, use_container_width=True)
+        if st.button("📈 오버레이로 비교", disabled=similar_roasts.empty):
+            overlay_names = [similar_query_name] if similar_query_name in st.session_state.profiles else []
+            for roast_id, roast_name in similar_roasts[['roast_id', 'name']].itertuples(index=False):
+                new_name = unique_profile_name(roast_name, st.session_state.profiles)
+                st.session_state.profiles[new_name], st.session_state.fan_profiles[new_name] = library.load(roast_id)
+                overlay_names.append(new_name)
+            update_processed_profiles(overlay_names); st.rerun()
 st.divider()
 
-profile_names = list(st.session_state.profiles.keys())
-cols = st.columns(len(profile_names))
-for i, col in enumerate(cols):
-    current_name = profile_names[i]
-    with col:
-        col1, col2 = st.columns([0.8, 0.2]);
-        with col1: new_name = st.text_input("프로파일 이름", value=current_name, key=f"name_input_{current_name}", label_visibility="collapsed")
-        with col2:
-            if st.button("삭제", key=f"delete_button_{current_name}"):
-                del st.session_state.profiles[current_name]
-                if current_name in st.session_state.fan_profiles: del st.session_state.fan_profiles[current_name]
-                st.rerun()
-        if new_name != current_name:
-            if new_name in st.session_state.profiles: st.error("이름 중복!")
-            elif not new_name: st.error("이름은 비워둘 수 없습니다.")
-            else:
-                new_profiles = {new_name if name == current_name else name: df for name, df in st.session_state.profiles.items()}
-                new_fan_profiles = {new_name if name == current_name else name: df for name, df in st.session_state.fan_profiles.items()}
-                st.session_state.profiles, st.session_state.fan_profiles = new_profiles, new_fan_profiles; st.rerun()
-        st.divider()
-        main_input_method = st.radio("입력 방식", ("시간 입력", "구간 입력"), key=f"main_input_{current_name}", horizontal=True)
-        st.subheader("온도 데이터 입력")
-        if main_input_method == "구간 입력":
-             st.info("구간(초): 현재 포인트에서 다음 포인트까지 걸릴 시간")
-        column_config = { "Point": None, "온도": st.column_config.NumberColumn("온도℃", format="%.1f"), "분": st.column_config.NumberColumn("분"), "초": st.column_config.NumberColumn("초"), "구간 시간 (초)": st.column_config.NumberColumn("구간(초)"), "누적 시간 (초)": st.column_config.NumberColumn("누적 시간(초)", disabled=True), "ROR (℃/sec)": st.column_config.NumberColumn("ROR", format="%.3f", disabled=True)}
-        default_visible_cols = ["온도"]
-        if main_input_method == "시간 입력": default_visible_cols += ["분", "초"]
-        else: default_visible_cols += ["구간 시간 (초)"]
+def rerun_after_sync():
+    # 그래프 업데이트 버튼이 처음 활성화될 때만 전체를 다시 실행하고, 그 외에는 해당 프로파일 열만 다시 실행
+    if st.session_state.graph_button_enabled:
+        try: st.rerun(scope="fragment")
+        except StreamlitAPIException: pass  # 전체 실행 중에는 fragment 범위 재실행 불가
+    st.session_state.graph_button_enabled = True; st.rerun()
+
+@st.fragment
+def render_profile_column(current_name):
+    col1, col2 = st.columns([0.8, 0.2]);
+    with col1: new_name = st.text_input("프로파일 이름", value=current_name, key=f"name_input_{current_name}", label_visibility="collapsed")
+    with col2:
+        if st.button("삭제", key=f"delete_button_{current_name}"):
+            del st.session_state.profiles[current_name]
+            if current_name in st.session_state.fan_profiles: del st.session_state.fan_profiles[current_name]
+            st.rerun()
+    if new_name != current_name:
+        if new_name in st.session_state.profiles: st.error("이름 중복!")
+        elif not new_name: st.error("이름은 비워둘 수 없습니다.")
+        else:
+            new_profiles = {new_name if name == current_name else name: df for name, df in st.session_state.profiles.items()}
+            new_fan_profiles = {new_name if name == current_name else name: df for name, df in st.session_state.fan_profiles.items()}
+            st.session_state.profiles, st.session_state.fan_profiles = new_profiles, new_fan_profiles; st.rerun()
+    st.divider()
+    main_input_method = st.radio("입력 방식", ("시간 입력", "구간 입력"), key=f"main_input_{current_name}", horizontal=True)
+    st.subheader("온도 데이터 입력")
+    if main_input_method == "구간 입력":
+         st.info("구간(초): 현재 포인트에서 다음 포인트까지 걸릴 시간")
+    column_config = { "Point": None, "온도": st.column_config.NumberColumn("온도℃", format="%.1f"), "분": st.column_config.NumberColumn("분"), "초": st.column_config.NumberColumn("초"), "구간 시간 (초)": st.column_config.NumberColumn("구간(초)"), "누적 시간 (초)": st.column_config.NumberColumn("누적 시간(초)", disabled=True), "ROR (℃/sec)": st.column_config.NumberColumn("ROR", format="%.3f", disabled=True)}
+    default_visible_cols = ["온도"]
+    if main_input_method == "시간 입력": default_visible_cols += ["분", "초"]
+    else: default_visible_cols += ["구간 시간 (초)"]
+    with timed(f"온도 편집기: {current_name}"):
         edited_df = st.data_editor(st.session_state.profiles[current_name], column_config=column_config, key=f"editor_{main_input_method}_{current_name}", hide_index=True, num_rows="dynamic", column_order=default_visible_cols)
-        if st.button("🔄 온도 데이터 동기화", key=f"sync_button_{current_name}"):
-            synced_df = sync_profile_data(edited_df, main_input_method); st.session_state.profiles[current_name] = synced_df; st.session_state.graph_button_enabled = True; st.rerun()
-        with st.expander("(선택) 팬 데이터 입력"):
-            fan_df = st.session_state.fan_profiles.get(current_name, create_new_fan_profile())
-            fan_column_config = {"Point": None, "Fan (%)": st.column_config.NumberColumn("팬(%)", min_value=0, max_value=100), "분": st.column_config.NumberColumn("분"), "초": st.column_config.NumberColumn("초"), "구간 시간 (초)": st.column_config.NumberColumn("구간(초)"), "누적 시간 (초)": st.column_config.NumberColumn("누적(초)", disabled=True)}
-            fan_visible_cols = ["Fan (%)"]
-            if main_input_method == "시간 입력": fan_visible_cols += ["분", "초"]
-            else: fan_visible_cols += ["구간 시간 (초)"]
+    if st.button("🔄 온도 데이터 동기화", key=f"sync_button_{current_name}"):
+        with timed(f"온도 동기화: {current_name}"): synced_df = sync_profile_data(edited_df, main_input_method)
+        st.session_state.profiles[current_name] = synced_df; rerun_after_sync()
+    with st.expander("(선택) 팬 데이터 입력"):
+        fan_df = st.session_state.fan_profiles.get(current_name, create_new_fan_profile())
+        fan_column_config = {"Point": None, "Fan (%)": st.column_config.NumberColumn("팬(%)", min_value=0, max_value=100), "분": st.column_config.NumberColumn("분"), "초": st.column_config.NumberColumn("초"), "구간 시간 (초)": st.column_config.NumberColumn("구간(초)"), "누적 시간 (초)": st.column_config.NumberColumn("누적(초)", disabled=True)}
+        fan_visible_cols = ["Fan (%)"]
+        if main_input_method == "시간 입력": fan_visible_cols += ["분", "초"]
+        else: fan_visible_cols += ["구간 시간 (초)"]
+        with timed(f"팬 편집기: {current_name}"):
             fan_edited_df = st.data_editor(fan_df, column_config=fan_column_config, column_order=fan_visible_cols, num_rows="dynamic", key=f"fan_editor_{current_name}", hide_index=True)
-            if st.button("🔄 팬 데이터 동기화", key=f"fan_sync_button_{current_name}"):
-                synced_fan_df = sync_fan_data(fan_edited_df, main_input_method); st.session_state.fan_profiles[current_name] = synced_fan_df; st.session_state.graph_button_enabled = True; st.rerun()
+        if st.button("🔄 팬 데이터 동기화", key=f"fan_sync_button_{current_name}"):
+            with timed(f"팬 동기화: {current_name}"): synced_fan_df = sync_fan_data(fan_edited_df, main_input_method)
+            st.session_state.fan_profiles[current_name] = synced_fan_df; rerun_after_sync()
+
+profile_names = list(st.session_state.profiles.keys())
+for row_start in range(0, len(profile_names), PROFILES_PER_ROW):
+    row_names = profile_names[row_start:row_start + PROFILES_PER_ROW]
+    for current_name, col in zip(row_names, st.columns(len(row_names))):
+        with col: render_profile_column(current_name)
 st.divider()
 
 st.header("📈 그래프 및 분석")
 if st.button("📊 그래프 업데이트", disabled=not st.session_state.graph_button_enabled):
-    profiles_with_data = [name for name, df in st.session_state.profiles.items() if not df['온도'].dropna().empty]
-    if profiles_with_data:
-        st.session_state.selected_profiles = profiles_with_data
-    st.session_state.processed_profiles = {name: calculate_ror(df.copy()) for name, df in st.session_state.profiles.items()}
-    st.session_state.processed_fan_profiles = {name: df.copy() for name, df in st.session_state.fan_profiles.items()}
-    st.session_state.selected_time = 0
-    st.rerun()
+    update_processed_profiles(); st.rerun()
 
-if st.session_state.processed_profiles:
+def get_profile_figure(selected_names):
+    # 처리된 데이터나 보기 옵션이 바뀔 때만 그래프를 다시 만들고, 그 외에는 세션에 저장된 그래프 재사용
+    colors = px.colors.qualitative.Plotly
+    color_map = {name: colors[i % len(colors)] for i, name in enumerate(st.session_state.profiles.keys())}
+    axis_ranges = st.session_state.get('axis_ranges', DEFAULT_AXIS_RANGES)
+    processed_keys = st.session_state.processed_keys
+    signature = (tuple((name, processed_keys.get(name), color_map.get(name)) for name in selected_names), repr(axis_ranges), st.session_state.render_mode, st.session_state.pixel_budget, st.session_state.ror_col)
+    cached_signature, fig = st.session_state.get('figure_cache', (None, None))
+    if cached_signature != signature:
+        with timed("그래프 생성"):
+            fig = build_profile_figure(st.session_state.processed_profiles, st.session_state.processed_fan_profiles, selected_names, color_map, axis_ranges,
+                                       render_mode=st.session_state.render_mode, pixel_budget=st.session_state.pixel_budget, trace_cache=st.session_state.trace_cache, profile_keys=processed_keys, ror_col=st.session_state.ror_col)
+        st.session_state.figure_cache = (signature, fig)
+    return fig
+
+@st.fragment
+def render_graph_and_analysis():
     graph_col, analysis_col = st.columns([0.7, 0.3])
-    max_time_temp = max((df['누적 시간 (초)'].max() for df in st.session_state.processed_profiles.values() if not df['누적 시간 (초)'].dropna().empty), default=0)
-    max_time_fan = max((df['누적 시간 (초)'].max() for df in st.session_state.processed_fan_profiles.values() if not df['누적 시간 (초)'].dropna().empty), default=0)
-    max_time = max(max_time_temp, max_time_fan, 1)
+    time_grid = st.session_state.time_grid
+    max_time = time_grid['max_time']
     
     with graph_col:
         selected_profiles_data = st.session_state.get('selected_profiles', [])
         
-        # 팬 데이터가 있는지 먼저 확인
-        fan_data_exists = False
-        for name in selected_profiles_data:
-            fan_df = st.session_state.processed_fan_profiles.get(name)
-            if fan_df is not None and not fan_df.dropna(subset=['Fan (%)']).empty:
-                fan_data_exists = True
-                break
-        
-        rows = 2 if fan_data_exists else 1
-        row_heights = [0.7, 0.3] if fan_data_exists else [1]
-        specs = [[{"secondary_y": True}]]
-        if fan_data_exists:
-            specs.append([{"secondary_y": False}] )
+        fig = get_profile_figure(selected_profiles_data)
+        set_time_marker(fig, int(st.session_state.get('selected_time', 0)))
+        with timed("그래프 전송"): st.plotly_chart(fig, use_container_width=True)
 
-        fig = make_subplots(rows=rows, cols=1, shared_xaxes=True, row_heights=row_heights, vertical_spacing=0.05, specs=specs)
-        
-        colors = px.colors.qualitative.Plotly
-        color_map = {name: colors[i % len(colors)] for i, name in enumerate(profile_names)}
-        
-        for name in selected_profiles_data:
-            df = st.session_state.processed_profiles.get(name); color = color_map.get(name)
-            if df is not None and color is not None:
-                valid_df = df.dropna(subset=['누적 시간 (초)', '온도']);
-                if len(valid_df) > 1:
-                    fig.add_trace(go.Scatter(x=valid_df['누적 시간 (초)'], y=valid_df['온도'], mode='lines+markers', name=name, line=dict(color=color), legendgroup=name), row=1, col=1, secondary_y=False)
-                    ror_df = valid_df.iloc[1:]
-                    fig.add_trace(go.Scatter(x=ror_df['누적 시간 (초)'], y=ror_df['ROR (℃/sec)'], mode='lines', name=f'{name} ROR', line=dict(color=color, dash='dot'), legendgroup=name, showlegend=False), row=1, col=1, secondary_y=True)
-            
-            if fan_data_exists:
-                fan_df = st.session_state.processed_fan_profiles.get(name)
-                if fan_df is not None and color is not None:
-                    valid_fan_df = fan_df.dropna(subset=['누적 시간 (초)', 'Fan (%)'])
-                    if len(valid_fan_df) > 1:
-                        fig.add_trace(go.Scatter(x=valid_fan_df['누적 시간 (초)'], y=valid_fan_df['Fan (%)'], mode='lines+markers', name=f'{name} Fan', line=dict(color=color, dash='solid'), legendgroup=name, showlegend=False), row=2, col=1)
-
-        selected_time_int = int(st.session_state.get('selected_time', 0)); fig.add_vline(x=selected_time_int, line_width=1, line_dash="dash", line_color="grey")
-        axis_ranges = st.session_state.get('axis_ranges', {'x': [0, 360], 'y': [85, 235], 'y2': [0, 0.75]})
-        fig.update_layout(height=900, legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-        
-        if fan_data_exists:
-            fig.update_xaxes(range=axis_ranges['x'], showticklabels=False, dtick=60, row=1, col=1)
-            fig.update_xaxes(range=axis_ranges['x'], title_text='시간 (초)', dtick=60, row=2, col=1)
-            fig.update_yaxes(title_text="팬 (%)", range=[60, 90], row=2, col=1)
-        else:
-            fig.update_xaxes(range=axis_ranges['x'], title_text='시간 (초)', showticklabels=True, dtick=60, row=1, col=1)
-
-        fig.update_yaxes(title_text="온도 (°C)", range=axis_ranges['y'], dtick=10, row=1, col=1, secondary_y=False)
-        fig.update_yaxes(title_text="ROR (℃/sec)", range=axis_ranges['y2'], showgrid=False, row=1, col=1, secondary_y=True)
-        st.plotly_chart(fig, use_container_width=True)
-
-    with analysis_col:
+    with analysis_col, timed("분석 패널"):
         st.subheader("🔍 분석 정보"); st.markdown("---")
         st.write("**총 로스팅 시간**")
         for name in selected_profiles_data:
-            df = st.session_state.processed_profiles.get(name)
-            if df is not None:
-                valid_df = df.dropna(subset=['누적 시간 (초)'])
-                if not valid_df.empty:
-                    total_time = valid_df['누적 시간 (초)'].max(); time_str = f"{int(total_time // 60)}분 {int(total_time % 60)}초"
-                    st.markdown(f"**{name}**: <span style='font-size: 1.1em;'>{time_str}</span>", unsafe_allow_html=True)
+            total_time = time_grid['end_time'].get(name, np.nan)
+            if not np.isnan(total_time):
+                time_str = f"{int(total_time // 60)}분 {int(total_time % 60)}초"
+                st.markdown(f"**{name}**: <span style='font-size: 1.1em;'>{time_str}</span>", unsafe_allow_html=True)
         st.markdown("---")
         def update_slider_time():
             st.session_state.selected_time = st.session_state.time_slider
@@ -235,22 +329,17 @@ if st.session_state.processed_profiles:
         for name in selected_profiles_data:
             st.markdown(f"<p style='margin-bottom: 0.2em;'><strong>{name}</strong></p>", unsafe_allow_html=True)
             temp_str, ror_str, fan_str = "--", "--", "--"
-            df = st.session_state.processed_profiles.get(name)
-            if df is not None:
-                valid_df = df.dropna(subset=['누적 시간 (초)', '온도', 'ROR (℃/sec)'])
-                if len(valid_df) > 1 and selected_time <= valid_df['누적 시간 (초)'].max():
-                    hover_temp = np.interp(selected_time, valid_df['누적 시간 (초)'], valid_df['온도']); hover_ror = np.interp(selected_time, valid_df['누적 시간 (초)'], valid_df['ROR (℃/sec)'])
-                    temp_str, ror_str = f"{hover_temp:.1f}℃", f"{hover_ror:.3f}℃/sec"
-            fan_df = st.session_state.processed_fan_profiles.get(name)
-            if fan_df is not None:
-                valid_fan_df = fan_df.dropna(subset=['누적 시간 (초)', 'Fan (%)'])
-                if len(valid_fan_df) > 1 and selected_time <= valid_fan_df['누적 시간 (초)'].max():
-                    hover_fan = np.interp(selected_time, valid_fan_df['누적 시간 (초)'], valid_fan_df['Fan (%)']); fan_str = f"{hover_fan:.1f}%"
+            hover_temp, hover_ror, hover_fan = (grid_value(time_grid, col, name, selected_time) for col in (TEMP_COL, st.session_state.ror_col, FAN_COL))
+            if not np.isnan(hover_temp): temp_str, ror_str = f"{hover_temp:.1f}℃", f"{hover_ror:.3f}℃/sec"
+            if not np.isnan(hover_fan): fan_str = f"{hover_fan:.1f}%"
             st.markdown(f"<p style='margin:0; font-size: 0.95em;'>&nbsp;&nbsp;• 온도: {temp_str}</p>", unsafe_allow_html=True)
             st.markdown(f"<p style='margin:0; font-size: 0.95em;'>&nbsp;&nbsp;• ROR: {ror_str}</p>", unsafe_allow_html=True)
             st.markdown(f"<p style='margin-bottom:0.8em; font-size: 0.95em;'>&nbsp;&nbsp;• 팬: {fan_str}</p>", unsafe_allow_html=True)
 
-with st.expander("🕒 포인트별 분석 보기"):
+if st.session_state.processed_profiles:
+    render_graph_and_analysis()
+
+with st.expander("🕒 포인트별 분석 보기"), timed("포인트별 분석"):
     if st.session_state.processed_profiles:
         selected_profiles_data = st.session_state.get('selected_profiles', [])
         for name in selected_profiles_data:
@@ -258,23 +347,25 @@ with st.expander("🕒 포인트별 분석 보기"):
             temp_df = st.session_state.processed_profiles.get(name)
             fan_df = st.session_state.processed_fan_profiles.get(name)
             if temp_df is not None and fan_df is not None:
+                temp_analysis_df, fan_analysis_df = point_analysis(temp_df, fan_df, st.session_state.ror_col)
                 st.write("**온도 포인트**")
-                temp_analysis_df = temp_df.dropna(subset=['온도']).copy()
-                if not temp_analysis_df.empty and not fan_df.dropna(subset=['Fan (%)']).empty and len(fan_df.dropna(subset=['Fan (%)'])) > 1:
-                    temp_analysis_df['Fan (%)'] = np.interp(temp_analysis_df['누적 시간 (초)'], fan_df['누적 시간 (초)'].dropna(), fan_df['Fan (%)'].dropna()).round(1)
-                temp_cols_order = ['온도', 'Fan (%)', '분', '초', '구간 시간 (초)', '누적 시간 (초)', 'ROR (℃/sec)']
+                temp_cols_order = ['온도', 'Fan (%)', '분', '초', '구간 시간 (초)', '누적 시간 (초)', st.session_state.ror_col]
                 col1, col2 = st.columns([0.8, 0.2])
                 with col1:
                     st.data_editor(temp_analysis_df, column_order=temp_cols_order, hide_index=True, disabled=True, use_container_width=True, key=f"temp_analysis_table_{name}")
 
                 st.write("**팬 포인트**")
-                fan_analysis_df = fan_df.dropna(subset=['Fan (%)']).copy()
-                if not fan_analysis_df.empty and not temp_df.dropna(subset=['온도']).empty and len(temp_df.dropna(subset=['온도'])) > 1:
-                    fan_analysis_df['온도'] = np.interp(fan_analysis_df['누적 시간 (초)'], temp_df['누적 시간 (초)'].dropna(), temp_df['온도'].dropna()).round(1)
-                    fan_analysis_df['ROR (℃/sec)'] = np.interp(fan_analysis_df['누적 시간 (초)'], temp_df['누적 시간 (초)'].dropna(), temp_df['ROR (℃/sec)'].dropna()).round(3)
-                fan_cols_order = ['온도', 'Fan (%)', '분', '초', '구간 시간 (초)', '누적 시간 (초)', 'ROR (℃/sec)']
+                fan_cols_order = ['온도', 'Fan (%)', '분', '초', '구간 시간 (초)', '누적 시간 (초)', st.session_state.ror_col]
                 col3, col4 = st.columns([0.8, 0.2])
                 with col3:
                     st.data_editor(fan_analysis_df, column_order=fan_cols_order, hide_index=True, disabled=True, use_container_width=True, key=f"fan_analysis_table_{name}")
     else:
         st.info("먼저 데이터를 입력하고 '그래프 업데이트' 버튼을 눌러주세요.")
+
+if st.session_state.stage_timer.enabled:
+    with st.sidebar.expander("🐞 단계별 실행 시간", expanded=True):
+        timing_df = st.session_state.stage_timer.summary()
+        st.dataframe(timing_df, column_config={"stage": "단계", "calls": "호출", "total_seconds": st.column_config.NumberColumn("합계(초)", format="%.4f"), "max_seconds": st.column_config.NumberColumn("최대(초)", format="%.4f"), "peak_mb": st.column_config.NumberColumn("최대 메모리(MB)", format="%.1f")},
+                     column_order=None if TRACK_MEMORY else ["stage", "calls", "total_seconds", "max_seconds"], hide_index=True, use_container_width=True)
+        st.caption(f"이번 전체 실행 합계 {timing_df['total_seconds'].sum() * 1000:.0f} ms · fragment 재실행은 'ikawa.timing' 로그에 기록됩니다.")
+        st.caption("최대 메모리는 프로세스 전체 기준이라 동시에 실행 중인 다른 세션의 할당도 포함됩니다." if TRACK_MEMORY else "메모리도 측정하려면 서버를 IKAWA_TRACK_MEMORY=1 환경 변수로 실행하세요.")
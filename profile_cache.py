@@ -0,0 +1,55 @@
+"""프로파일 처리 결과 캐시 (Streamlit 의존성 없음).
+
+프로파일 데이터와 입력 방식의 해시를 키로 처리 결과를 보관하고, 크기를 넘으면 가장 오래 쓰이지 않은
+항목부터 지운다. 값은 여러 세션이 공유하므로 꺼낸 DataFrame을 직접 수정하면 안 된다.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def profile_key(df, input_mode=None):
+    # 데이터(인덱스, 컬럼 이름 포함)와 입력 방식이 같으면 같은 키
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update('\x1f'.join(map(str, df.columns)).encode())
+    digest.update(str(input_mode).encode())
+    return digest.hexdigest()
+
+
+class ProfileCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items: return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get_many(self, keys, values, compute_batch):
+        # 캐시에 없는 값만 모아 compute_batch 한 번으로 계산하고 결과를 키 순서대로 반환
+        results = [self.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            computed = compute_batch([values[i] for i in missing])
+            for i, result in zip(missing, computed):
+                self.put(keys[i], result); results[i] = result
+        return results
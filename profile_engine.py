@@ -0,0 +1,309 @@
+"""Ikawa 프로파일 계산 엔진 (Streamlit 의존성 없음).
+
+여러 프로파일을 NaN으로 채운 (프로파일 수 × 포인트 수) 배열로 묶어 누적 시간, 구간 시간,
+ROR을 한 번에 벡터 연산으로 계산한다.
+"""
+import numpy as np
+import pandas as pd
+
+TIME_INPUT_MODE = '시간 입력'
+INTERVAL_INPUT_MODE = '구간 입력'
+
+TEMP_COL = '온도'
+FAN_COL = 'Fan (%)'
+MIN_COL = '분'
+SEC_COL = '초'
+INTERVAL_COL = '구간 시간 (초)'
+CUMULATIVE_COL = '누적 시간 (초)'
+ROR_COL = 'ROR (℃/sec)'
+ROR_WINDOW_COL = 'ROR 구간 (℃/sec)'
+ROR_SAVGOL_COL = 'ROR Savitzky-Golay (℃/sec)'
+ROR_EMA_COL = 'ROR 지수 평활 (℃/sec)'
+ROR_COLUMNS = {ROR_COL: '원본 (인접 포인트)', ROR_WINDOW_COL: '구간 평균', ROR_SAVGOL_COL: 'Savitzky-Golay', ROR_EMA_COL: '지수 평활'}
+
+ROR_WINDOW_SECONDS = 30  # 구간 평균: 현재 시점과 N초 전 포인트 사이의 평균 기울기
+SAVGOL_WINDOW_SECONDS = 30  # Savitzky-Golay: 현재 시점 ±N/2초 안 포인트의 최소제곱 기울기
+EMA_TAU_SECONDS = 15  # 지수 평활: 원본 ROR의 시간 상수
+EMA_MAX_EXPONENT = 500  # exp 오버플로를 피하기 위해 이 값(× 시간 상수)마다 블록을 나눈다
+
+
+# --- 배열 변환 ---
+def pad_profiles(dfs, columns):
+    # 길이가 다른 프로파일들을 NaN으로 채운 2차원 배열로 변환
+    n_points = max((len(df) for df in dfs), default=0)
+    arrays = {col: np.full((len(dfs), n_points), np.nan) for col in columns}
+    for i, df in enumerate(dfs):
+        for col in columns:
+            arrays[col][i, :len(df)] = df[col].to_numpy(dtype=float, na_value=np.nan)
+    return arrays
+
+def valid_lengths(values):
+    # 각 프로파일의 마지막 유효값 위치 + 1 (값이 하나도 없으면 0)
+    if values.shape[1] == 0: return np.zeros(len(values), dtype=int)
+    notna = ~np.isnan(values)
+    last = values.shape[1] - 1 - np.argmax(notna[:, ::-1], axis=1)
+    return np.where(notna.any(axis=1), last + 1, 0)
+
+def _in_range(lengths, n_points):
+    return np.arange(n_points) < lengths[:, None]
+
+
+# --- 벡터 연산 ---
+def compute_timing(minutes, seconds, intervals, cumulative, lengths, modes):
+    # 입력 방식별 누적/구간 시간 계산. 범위 밖이거나 갱신하지 않는 칸은 NaN
+    modes = np.asarray(modes)
+    n_points = minutes.shape[1]
+    in_range = _in_range(lengths, n_points)
+    is_time = (modes == TIME_INPUT_MODE)[:, None]
+    is_interval = (modes == INTERVAL_INPUT_MODE)[:, None]
+
+    # 시간 입력: 분/초 → 누적 시간, 다음 포인트까지의 차이 → 구간 시간
+    cum_from_time = np.nan_to_num(minutes) * 60 + np.nan_to_num(seconds)
+    interval_from_time = np.full_like(cum_from_time, np.nan)
+    interval_from_time[:, :-1] = np.diff(cum_from_time, axis=1)
+    interval_from_time[~_in_range(lengths - 1, n_points)] = np.nan
+
+    # 구간 입력: 구간 시간 누적합 → 누적 시간, 분/초
+    steps = np.where(in_range, np.nan_to_num(intervals), 0)
+    cum_from_interval = np.zeros_like(steps)
+    cum_from_interval[:, 1:] = np.cumsum(steps, axis=1)[:, :-1]
+
+    new_cumulative = np.select([is_time, is_interval], [cum_from_time, cum_from_interval], cumulative)
+    new_interval = np.where(is_time, interval_from_time, np.nan)
+    new_minutes = np.where(is_interval, new_cumulative // 60, np.nan)
+    new_seconds = np.where(is_interval, new_cumulative % 60, np.nan)
+    timing = {CUMULATIVE_COL: new_cumulative, INTERVAL_COL: new_interval, MIN_COL: new_minutes, SEC_COL: new_seconds}
+    for values in timing.values():
+        values[~in_range] = np.nan
+    return timing
+
+def compute_ror(values, cumulative, lengths):
+    # 인접 포인트 간 온도 변화 / 시간 변화. inf, NaN은 0으로 처리
+    ror = np.zeros_like(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ror[:, 1:] = np.diff(values, axis=1) / np.diff(cumulative, axis=1)
+    ror[~np.isfinite(ror)] = 0
+    ror[~_in_range(lengths, values.shape[1])] = np.nan
+    return ror
+
+
+# --- DataFrame 일괄 처리 ---
+def _merge(df, updates, length):
+    # DataFrame.update 와 동일하게 NaN이 아닌 값만 덮어쓴 새 DataFrame 반환
+    columns = {}
+    for col, values in updates.items():
+        merged = df[col].to_numpy(dtype=float, na_value=np.nan, copy=True)
+        new = values[:length]
+        merged[:length] = np.where(np.isnan(new), merged[:length], new)
+        columns[col] = merged
+    return df.assign(**columns)
+
+def sync_profiles(dfs, modes, value_col=TEMP_COL, with_ror=True):
+    # sync_profile_data / sync_fan_data 의 일괄 처리 버전
+    dfs = [df.reset_index(drop=True) for df in dfs]
+    dfs = [df.assign(Point=df.index) for df in dfs]
+    if not dfs: return dfs
+    columns = [value_col, MIN_COL, SEC_COL, INTERVAL_COL, CUMULATIVE_COL]
+    arrays = pad_profiles(dfs, columns)
+    lengths = valid_lengths(arrays[value_col])
+    updates = compute_timing(arrays[MIN_COL], arrays[SEC_COL], arrays[INTERVAL_COL], arrays[CUMULATIVE_COL], lengths, modes)
+    if with_ror:
+        updates[ROR_COL] = compute_ror(arrays[value_col], updates[CUMULATIVE_COL], lengths)
+    return [_merge(df, {col: values[i] for col, values in updates.items()}, lengths[i]) if lengths[i] else df for i, df in enumerate(dfs)]
+
+def calculate_ror_batch(dfs):
+    # 이미 계산된 누적 시간으로 ROR만 다시 계산
+    dfs = list(dfs)
+    if not dfs: return dfs
+    arrays = pad_profiles(dfs, [TEMP_COL, CUMULATIVE_COL])
+    lengths = valid_lengths(arrays[TEMP_COL])
+    ror = compute_ror(arrays[TEMP_COL], arrays[CUMULATIVE_COL], lengths)
+    return [_merge(df, {ROR_COL: ror[i]}, lengths[i]) if lengths[i] else df for i, df in enumerate(dfs)]
+
+
+def profile_from_arrays(times, values, value_col=TEMP_COL):
+    # (누적 시간, 값) 배열 → 시간 입력 방식으로 동기화된 프로파일 DataFrame
+    times, values = np.asarray(times, dtype=float), np.asarray(values, dtype=float)
+    data = {'Point': np.arange(len(times)), value_col: values, MIN_COL: times // 60, SEC_COL: times % 60, INTERVAL_COL: np.nan, CUMULATIVE_COL: times}
+    if value_col == TEMP_COL: data[ROR_COL] = np.nan
+    return sync_profiles([pd.DataFrame(data)], [TIME_INPUT_MODE], value_col, with_ror=value_col == TEMP_COL)[0]
+
+# --- 스무딩 ROR ---
+class SmoothedRor:
+    # 구간 평균 / Savitzky-Golay / 지수 평활 ROR을 함께 계산. append 로 샘플을 추가하면 영향을 받는 포인트만 다시 계산
+    # 시간 간격이 일정하지 않아도 되며, 시간은 오름차순이어야 한다
+    def __init__(self, window=ROR_WINDOW_SECONDS, savgol_window=SAVGOL_WINDOW_SECONDS, tau=EMA_TAU_SECONDS):
+        self.window, self.half_window, self.tau = window, savgol_window / 2, tau
+        self.times, self.temps = np.zeros(0), np.zeros(0)
+        self._sums = np.zeros((5, 1))  # 누적합: 개수, t, t², y, t·y (t 는 첫 샘플 기준)
+        self.ror = {col: np.zeros(0) for col in ROR_COLUMNS}
+
+    def __len__(self):
+        return len(self.times)
+
+    def append(self, times, temps):
+        times, temps = np.asarray(times, dtype=float), np.asarray(temps, dtype=float)
+        if not len(times): return self.ror
+        start = len(self.times)
+        if start and times[0] < self.times[-1]: raise ValueError("시간은 오름차순이어야 합니다.")
+        self.times, self.temps = np.concatenate([self.times, times]), np.concatenate([self.temps, temps])
+        t = self.times[start:] - self.times[0]
+        terms = np.stack([np.ones_like(t), t, t * t, temps, t * temps])
+        self._sums = np.concatenate([self._sums, self._sums[:, -1:] + np.cumsum(terms, axis=1)], axis=1)
+
+        self.ror[ROR_COL] = np.concatenate([self.ror[ROR_COL], self._raw_ror(max(start - 1, 0))[start:]])
+        self.ror[ROR_WINDOW_COL] = np.concatenate([self.ror[ROR_WINDOW_COL], self._window_ror(start)])
+        # Savitzky-Golay 는 중심 창이므로 새 샘플이 창에 들어오는 기존 포인트도 다시 계산
+        savgol_start = int(np.searchsorted(self.times, times[0] - self.half_window, side='left'))
+        self.ror[ROR_SAVGOL_COL] = np.concatenate([self.ror[ROR_SAVGOL_COL][:savgol_start], self._savgol_ror(savgol_start)])
+        self.ror[ROR_EMA_COL] = np.concatenate([self.ror[ROR_EMA_COL], self._ema_ror(start)])
+        return self.ror
+
+    def _raw_ror(self, start):
+        # 인접 포인트 간 기울기 (첫 포인트와 inf/NaN 은 0). start 이전은 0으로 채움
+        ror = np.zeros(len(self.times))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ror[start + 1:] = np.diff(self.temps[start:]) / np.diff(self.times[start:])
+        ror[~np.isfinite(ror)] = 0
+        return ror
+
+    def _window_ror(self, start):
+        times, temps = self.times[start:], self.temps[start:]
+        previous = np.maximum(np.searchsorted(self.times, times - self.window, side='right') - 1, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ror = (temps - self.temps[previous]) / (times - self.times[previous])
+        ror[~np.isfinite(ror)] = 0
+        return ror
+
+    def _savgol_ror(self, start):
+        # 1차 최소제곱 기울기 = 대칭 창에서의 Savitzky-Golay 1차 미분. 포인트가 2개 미만이면 원본 ROR 사용
+        times = self.times[start:]
+        lo = np.searchsorted(self.times, times - self.half_window, side='left')
+        hi = np.searchsorted(self.times, times + self.half_window, side='right')
+        n, s_t, s_tt, s_y, s_ty = self._sums[:, hi] - self._sums[:, lo]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ror = (n * s_ty - s_t * s_y) / (n * s_tt - s_t * s_t)
+        fallback = (n < 2) | ~np.isfinite(ror)
+        ror[fallback] = self._raw_ror(max(start - 1, 0))[start:][fallback]
+        return ror
+
+    def _ema_ror(self, start):
+        # y_i = y_{i-1} + (1 - e^{-Δt/τ})(x_i - y_{i-1}) 를 블록마다 닫힌 식(누적합)으로 계산
+        raw = self._raw_ror(max(start - 1, 0))[start:]
+        times = self.times[start:]
+        ema = np.empty_like(raw)
+        if start: prev_time, prev_value = self.times[start - 1], self.ror[ROR_EMA_COL][start - 1]
+        else: prev_time, prev_value = times[0], raw[0]
+        i = 0
+        while i < len(times):
+            end = i + int(np.searchsorted(times[i:], prev_time + EMA_MAX_EXPONENT * self.tau, side='right'))
+            if end <= i:
+                # 간격이 너무 길면 닫힌 식 대신 한 포인트만 직접 계산
+                decay = np.exp(-(times[i] - prev_time) / self.tau)
+                ema[i] = decay * prev_value + (1 - decay) * raw[i]
+                prev_time, prev_value, i = times[i], ema[i], i + 1
+                continue
+            offset = (times[i:end] - prev_time) / self.tau
+            alpha = 1 - np.exp(-np.diff(np.concatenate([[0], offset])))
+            ema[i:end] = np.exp(-offset) * (prev_value + np.cumsum(alpha * raw[i:end] * np.exp(offset)))
+            prev_time, prev_value, i = times[end - 1], ema[end - 1], end
+        return ema
+
+def smoothed_ror(times, temps, **kwargs):
+    # 한 번에 계산: {ROR 컬럼: 배열}
+    return SmoothedRor(**kwargs).append(times, temps)
+
+def update_smoothed_ror(state, times, temps):
+    # state 의 샘플이 (times, temps) 의 앞부분과 같으면 뒤에 붙은 샘플만 append, 아니면 처음부터 계산
+    n = len(state) if state is not None else 0
+    if state is None or n > len(times) or not (np.array_equal(state.times, times[:n]) and np.array_equal(state.temps, temps[:n], equal_nan=True)):
+        state, n = SmoothedRor(), 0
+    state.append(times[n:], temps[n:])
+    return state
+
+def add_smoothed_ror(dfs, states=None):
+    # 유효한 (누적 시간, 온도) 포인트에 스무딩 ROR 컬럼 추가. 시간이 섞여 있으면 정렬해서 계산 후 되돌림
+    # states: dfs 와 같은 길이의 SmoothedRor(또는 None) 목록. 주면 이어지는 샘플만 계산하고 목록을 새 상태로 바꾼다
+    results = []
+    for i, df in enumerate(dfs):
+        valid = (df[CUMULATIVE_COL].notna() & df[TEMP_COL].notna()).to_numpy()
+        times, temps = df[CUMULATIVE_COL].to_numpy(dtype=float)[valid], df[TEMP_COL].to_numpy(dtype=float)[valid]
+        order = np.argsort(times, kind='stable')
+        if states is None:
+            ror = smoothed_ror(times[order], temps[order])
+        else:
+            states[i] = update_smoothed_ror(states[i], times[order], temps[order]); ror = states[i].ror
+        columns = {}
+        for col in (ROR_WINDOW_COL, ROR_SAVGOL_COL, ROR_EMA_COL):
+            values = np.full(len(df), np.nan)
+            values[np.flatnonzero(valid)[order]] = ror[col]
+            columns[col] = values
+        results.append(df.assign(**columns))
+    return results
+
+# --- 포인트별 분석 / 요약 ---
+def point_analysis(temp_df, fan_df, ror_col=ROR_COL):
+    # 온도 포인트에 팬 값을, 팬 포인트에 온도/ROR(ror_col) 값을 보간해 붙인 (온도 포인트 표, 팬 포인트 표)
+    valid_temp_df = temp_df.dropna(subset=[CUMULATIVE_COL, TEMP_COL])
+    valid_fan_df = fan_df.dropna(subset=[CUMULATIVE_COL, FAN_COL])
+    temp_analysis_df = temp_df.dropna(subset=[TEMP_COL]).copy()
+    if not temp_analysis_df.empty and len(valid_fan_df) > 1:
+        temp_analysis_df[FAN_COL] = np.interp(temp_analysis_df[CUMULATIVE_COL], valid_fan_df[CUMULATIVE_COL], valid_fan_df[FAN_COL]).round(1)
+    fan_analysis_df = fan_df.dropna(subset=[FAN_COL]).copy()
+    if not fan_analysis_df.empty and len(valid_temp_df) > 1:
+        fan_analysis_df[TEMP_COL] = np.interp(fan_analysis_df[CUMULATIVE_COL], valid_temp_df[CUMULATIVE_COL], valid_temp_df[TEMP_COL]).round(1)
+        fan_analysis_df[ror_col] = np.interp(fan_analysis_df[CUMULATIVE_COL], valid_temp_df[CUMULATIVE_COL], valid_temp_df[ror_col].fillna(0)).round(3)
+    return temp_analysis_df, fan_analysis_df
+
+def profile_summary(profile_df, fan_df=None):
+    # 총 시간, 투입/배출/최고 온도, 평균/최대 ROR, 팬 범위
+    valid_df = profile_df.dropna(subset=[CUMULATIVE_COL, TEMP_COL])
+    valid_fan_df = fan_df.dropna(subset=[CUMULATIVE_COL, FAN_COL]) if fan_df is not None else None
+    summary = {'total_time': np.nan, 'charge_temp': np.nan, 'drop_temp': np.nan, 'max_temp': np.nan, 'mean_ror': np.nan, 'max_ror': np.nan, 'n_points': len(valid_df)}
+    if not valid_df.empty:
+        times, temps = valid_df[CUMULATIVE_COL].to_numpy(dtype=float), valid_df[TEMP_COL].to_numpy(dtype=float)
+        ror_col = ROR_SAVGOL_COL if ROR_SAVGOL_COL in valid_df else ROR_COL
+        summary.update(total_time=times.max(), charge_temp=temps[0], drop_temp=temps[-1], max_temp=temps.max(), max_ror=valid_df[ror_col].max())
+        if times.max() > times[0]: summary['mean_ror'] = (temps[-1] - temps[0]) / (times.max() - times[0])
+    summary['has_fan'] = valid_fan_df is not None and not valid_fan_df.empty
+    summary['min_fan'] = valid_fan_df[FAN_COL].min() if summary['has_fan'] else np.nan
+    summary['max_fan'] = valid_fan_df[FAN_COL].max() if summary['has_fan'] else np.nan
+    return summary
+
+# --- 공통 시간 그리드 ---
+def max_cumulative_time(dfs):
+    # 프로파일들의 최대 누적 시간 (값이 없으면 0)
+    ends = [df[CUMULATIVE_COL].max() for df in dfs if df is not None]
+    return max((end for end in ends if pd.notna(end)), default=0)
+
+def resample_to_grid(dfs, value_cols, seconds):
+    # value_cols 가 모두 유효한 포인트만으로 각 프로파일을 seconds 에 한 번 보간
+    # 반환: {컬럼: (프로파일 × 그리드) 배열}, 포인트가 2개 미만이거나 마지막 시간 이후는 NaN
+    grid = {col: np.full((len(dfs), len(seconds)), np.nan) for col in value_cols}
+    for i, df in enumerate(dfs):
+        if df is None: continue
+        valid_df = df.dropna(subset=[CUMULATIVE_COL, *value_cols])
+        if len(valid_df) < 2: continue
+        times = valid_df[CUMULATIVE_COL].to_numpy(dtype=float)
+        inside = seconds <= times.max()
+        for col in value_cols:
+            grid[col][i, inside] = np.interp(seconds[inside], times, valid_df[col].to_numpy(dtype=float))
+    return grid
+
+def build_time_grid(profiles, fan_profiles, step=1):
+    # 처리된 온도/팬 프로파일을 step 초 간격의 공통 그리드로 리샘플링. end_time: 프로파일별 총 로스팅 시간
+    names = list(profiles.keys())
+    end_times = {name: profiles[name][CUMULATIVE_COL].max() for name in names}
+    max_time = max(max((end for end in end_times.values() if pd.notna(end)), default=0), max_cumulative_time(fan_profiles.values()), 1)
+    seconds = np.arange(0, int(max_time) + 1, step, dtype=float)
+    grid = {'names': names, 'index': {name: i for i, name in enumerate(names)}, 'seconds': seconds, 'step': step, 'max_time': max_time, 'end_time': end_times}
+    ror_cols = [col for col in ROR_COLUMNS if all(col in df for df in profiles.values())]
+    grid.update(resample_to_grid([profiles[name] for name in names], [TEMP_COL, *ror_cols], seconds))
+    grid.update(resample_to_grid([fan_profiles.get(name) for name in names], [FAN_COL], seconds))
+    return grid
+
+def grid_value(grid, col, name, time):
+    # 그리드에서 name 프로파일의 time 초 값 (없으면 NaN)
+    row, col_idx = grid['index'].get(name), int(round(time / grid['step']))
+    if row is None or not 0 <= col_idx < len(grid['seconds']): return np.nan
+    return grid[col][row, col_idx]
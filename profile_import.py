@@ -0,0 +1,137 @@
+"""로스터/앱 로그 파일(CSV, Parquet) 가져오기 (Streamlit 의존성 없음).
+
+로그를 청크 단위로 읽으면서 시간/온도/팬 컬럼만 float 배열로 남기므로 파일당 메모리는 필요한 세 컬럼
+크기로 제한된다. 결과는 create_new_profile / create_new_fan_profile 과 같은 구조의 DataFrame이다.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from profile_engine import TEMP_COL, FAN_COL, CUMULATIVE_COL, profile_from_arrays
+
+# 컬럼 이름 후보 (대소문자, 앞뒤 공백 무시)
+DEFAULT_COLUMN_ALIASES = {
+    'time': ['time', 'time (s)', 'seconds', 'elapsed', 'elapsed time', CUMULATIVE_COL, '시간'],
+    'temp': ['temp', 'temperature', 'bean temp', 'temp below', 'temp above', TEMP_COL],
+    'fan': ['fan', 'fan set', 'fan (%)', 'fan speed (%)', '팬'],
+}
+TIME_UNITS = {'s': 1.0, 'ms': 0.001, 'min': 60.0}
+TEMP_UNITS = ('C', 'F')
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def _normalize(name):
+    return str(name).strip().lower()
+
+def resolve_columns(header, column_map=None):
+    # 로그 헤더에서 시간/온도/팬 컬럼 이름을 찾는다. column_map 으로 직접 지정 가능
+    column_map = {key: value for key, value in (column_map or {}).items() if value}
+    by_name = {_normalize(col): col for col in header}
+    resolved = {}
+    for key, aliases in DEFAULT_COLUMN_ALIASES.items():
+        candidates = [column_map[key]] if key in column_map else aliases
+        resolved[key] = next((by_name[_normalize(c)] for c in candidates if _normalize(c) in by_name), None)
+        if key in column_map and resolved[key] is None:
+            raise ValueError(f"'{column_map[key]}' 컬럼을 찾을 수 없습니다.")
+    if resolved['time'] is None:
+        raise ValueError("시간 컬럼을 찾을 수 없습니다.")
+    if resolved['temp'] is None and resolved['fan'] is None:
+        raise ValueError("온도 또는 팬 컬럼을 찾을 수 없습니다.")
+    return resolved
+
+def _is_parquet(source):
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', '')
+    return str(name).lower().endswith(('.parquet', '.pq'))
+
+def _iter_raw_chunks(source, chunksize):
+    # (헤더, 청크 반복자) — 청크는 필요한 컬럼만 담은 DataFrame
+    if _is_parquet(source):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet 파일을 읽으려면 pyarrow가 필요합니다.") from e
+        parquet_file = pq.ParquetFile(source)
+        header = parquet_file.schema_arrow.names
+        return header, lambda columns: (batch.to_pandas() for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns))
+    if hasattr(source, 'seek'): source.seek(0)
+    header = pd.read_csv(source, nrows=0).columns.tolist()
+    if hasattr(source, 'seek'): source.seek(0)
+    return header, lambda columns: pd.read_csv(source, usecols=columns, chunksize=chunksize)
+
+def _datetime_seconds(stamps):
+    # 날짜/시각 → 1970-01-01 기준 초 (첫 샘플 기준 0초로 맞추는 것은 read_log_arrays 에서)
+    if stamps.dt.tz is not None: stamps = stamps.dt.tz_convert(None)
+    return (stamps - pd.Timestamp(0)).dt.total_seconds()
+
+def _parse_time(values, time_unit):
+    # 숫자는 time_unit 기준으로 초 변환, 'mm:ss' 와 날짜/시각 문자열('2025-10-13 10:00:01')도 허용
+    if pd.api.types.is_datetime64_any_dtype(values): return _datetime_seconds(values).to_numpy(dtype=float)
+    seconds = pd.to_numeric(values, errors='coerce') * TIME_UNITS[time_unit]
+    if not pd.api.types.is_numeric_dtype(values):
+        clock = values.astype(str).str.extract(r'^\s*(\d+):(\d+(?:\.\d+)?)\s*$').astype(float)
+        seconds = seconds.fillna(clock[0] * 60 + clock[1])
+        if seconds.isna().any():
+            stamps = pd.to_datetime(values.where(seconds.isna()), errors='coerce', format='mixed')
+            seconds = seconds.fillna(_datetime_seconds(stamps))
+    return seconds.to_numpy(dtype=float)
+
+def _dedupe_timestamps(times, *columns):
+    # 시간순 정렬 후 같은 시간은 마지막 샘플만 유지
+    order = np.argsort(times, kind='stable')
+    times = times[order]
+    keep = np.append(times[1:] != times[:-1], True) if len(times) else np.zeros(0, dtype=bool)
+    return (times[keep], *(col[order][keep] for col in columns))
+
+def _drop_flat_runs(times, values):
+    # 같은 값이 이어지는 구간은 처음과 끝만 남긴다 (선형 보간 결과는 같음)
+    valid = ~np.isnan(values)
+    times, values = times[valid], values[valid]
+    if len(values) < 3: return times, values
+    changed = values[1:] != values[:-1]
+    keep = np.concatenate(([True], changed[:-1] | changed[1:], [True]))
+    return times[keep], values[keep]
+
+def read_log_arrays(source, column_map=None, time_unit='s', temp_unit='C', chunksize=DEFAULT_CHUNKSIZE):
+    # 로그를 청크 단위로 읽어 (시간, 온도, 팬) float 배열 반환. 시간은 첫 샘플 기준 0초부터
+    if time_unit not in TIME_UNITS: raise ValueError(f"지원하지 않는 시간 단위: {time_unit}")
+    if temp_unit not in TEMP_UNITS: raise ValueError(f"지원하지 않는 온도 단위: {temp_unit}")
+    header, read_chunks = _iter_raw_chunks(source, chunksize)
+    columns = resolve_columns(header, column_map)
+    usecols = [col for col in dict.fromkeys(columns.values()) if col is not None]
+    times, temps, fans = [], [], []
+    for chunk in read_chunks(usecols):
+        chunk_times = _parse_time(chunk[columns['time']], time_unit)
+        valid = ~np.isnan(chunk_times)
+        times.append(chunk_times[valid])
+        for key, out in (('temp', temps), ('fan', fans)):
+            values = pd.to_numeric(chunk[columns[key]], errors='coerce').to_numpy(dtype=float) if columns[key] else np.full(len(chunk), np.nan)
+            out.append(values[valid])
+    times, temps, fans = (np.concatenate(parts) if parts else np.zeros(0) for parts in (times, temps, fans))
+    if not len(times): raise ValueError(f"'{columns['time']}' 컬럼에서 시간 값을 읽을 수 없습니다.")
+    times, temps, fans = _dedupe_timestamps(times, temps, fans)
+    if np.isnan(temps).all() and np.isnan(fans).all(): raise ValueError("온도/팬 컬럼에서 숫자 값을 읽을 수 없습니다.")
+    times = times - times[0]
+    if temp_unit == 'F': temps = (temps - 32) * 5 / 9
+    return times, temps, fans
+
+def log_to_profiles(times, temps, fans):
+    # (시간, 온도, 팬) 배열 → 동기화까지 끝난 (온도 프로파일, 팬 프로파일)
+    valid = ~np.isnan(temps)
+    return profile_from_arrays(times[valid], temps[valid], TEMP_COL), profile_from_arrays(*_drop_flat_runs(times, fans), FAN_COL)
+
+def read_roast_log(source, column_map=None, time_unit='s', temp_unit='C', chunksize=DEFAULT_CHUNKSIZE):
+    return log_to_profiles(*read_log_arrays(source, column_map, time_unit, temp_unit, chunksize))
+
+def read_roast_logs(sources, max_workers=None, **kwargs):
+    # 여러 로그를 스레드 풀에서 병렬로 읽는다. 결과 순서는 sources 와 같고, 실패한 파일은 예외 객체로 반환
+    def read_one(source):
+        try:
+            return read_roast_log(source, **kwargs)
+        except (ValueError, ImportError, OSError, pd.errors.ParserError) as e:
+            return e
+    sources = list(sources)
+    if len(sources) <= 1: return [read_one(source) for source in sources]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(read_one, sources))
@@ -0,0 +1,97 @@
+"""디스크에 저장되는 로스팅 프로파일 라이브러리 (Streamlit 의존성 없음).
+
+로스팅마다 (누적 시간, 값) 곡선을 .npy 파일로 저장해 메모리 매핑으로 읽고, 이름/날짜/원두/총 시간/
+투입·배출 온도는 작은 index.csv 에 따로 둔다. 목록 조회와 필터는 인덱스만 읽고, 곡선은 불러올 때만 읽는다.
+"""
+import os
+import threading
+import uuid
+from datetime import date as date_type
+
+import numpy as np
+import pandas as pd
+
+from profile_engine import TEMP_COL, FAN_COL, CUMULATIVE_COL, profile_from_arrays
+
+DEFAULT_LIBRARY_DIR = os.environ.get('IKAWA_LIBRARY_DIR', 'roast_library')
+INDEX_COLUMNS = ['roast_id', 'name', 'date', 'bean', 'total_time', 'charge_temp', 'drop_temp', 'n_points', 'has_fan']
+
+
+def curve_arrays(df, value_col):
+    # 프로파일에서 유효한 (누적 시간, 값) 포인트만 (n, 2) 배열로
+    if df is None: return np.zeros((0, 2))
+    valid_df = df.dropna(subset=[CUMULATIVE_COL, value_col])
+    return valid_df[[CUMULATIVE_COL, value_col]].to_numpy(dtype=float)
+
+
+class ProfileLibrary:
+    def __init__(self, root=DEFAULT_LIBRARY_DIR):
+        self.root = root
+        self.curve_dir = os.path.join(root, 'curves')
+        self.index_path = os.path.join(root, 'index.csv')
+        self._lock = threading.Lock()
+        self._index, self._index_mtime = None, None
+        os.makedirs(self.curve_dir, exist_ok=True)
+
+    # --- 인덱스 ---
+    def index(self):
+        # 다른 프로세스가 바꿨을 수 있으므로 파일 수정 시각이 바뀌면 다시 읽는다
+        mtime = os.path.getmtime(self.index_path) if os.path.exists(self.index_path) else None
+        if self._index is None or mtime != self._index_mtime:
+            index = pd.read_csv(self.index_path, dtype={'roast_id': str, 'name': str, 'bean': str}, keep_default_na=False, na_values=['']) if mtime else pd.DataFrame(columns=INDEX_COLUMNS)
+            self._index, self._index_mtime = index.reindex(columns=INDEX_COLUMNS), mtime
+        return self._index
+
+    def _write_index(self, index):
+        tmp_path = f"{self.index_path}.{uuid.uuid4().hex}.tmp"
+        index.to_csv(tmp_path, index=False); os.replace(tmp_path, self.index_path)
+        self._index, self._index_mtime = index, os.path.getmtime(self.index_path)
+
+    def search(self, text='', beans=None, date_from=None, date_to=None):
+        # 인덱스만으로 필터 (이름/원두 부분 일치, 원두 목록, 날짜 범위)
+        index = self.index()
+        mask = pd.Series(True, index=index.index)
+        if text:
+            mask &= index['name'].fillna('').str.contains(text, case=False, regex=False) | index['bean'].fillna('').str.contains(text, case=False, regex=False)
+        if beans: mask &= index['bean'].isin(beans)
+        if date_from: mask &= index['date'] >= str(date_from)
+        if date_to: mask &= index['date'] <= str(date_to)
+        return index[mask]
+
+    # --- 저장 / 불러오기 ---
+    def _curve_path(self, roast_id, kind):
+        return os.path.join(self.curve_dir, f"{roast_id}.{kind}.npy")
+
+    def save(self, name, profile_df, fan_df=None, bean='', date=None):
+        temp_curve = curve_arrays(profile_df, TEMP_COL)
+        if len(temp_curve) < 2: raise ValueError("누적 시간이 있는 온도 포인트가 2개 이상 필요합니다. 프로파일을 동기화한 뒤 저장하세요.")
+        fan_curve = curve_arrays(fan_df, FAN_COL)
+        roast_id = uuid.uuid4().hex[:12]
+        np.save(self._curve_path(roast_id, 'temp'), temp_curve)
+        if len(fan_curve): np.save(self._curve_path(roast_id, 'fan'), fan_curve)
+        entry = {'roast_id': roast_id, 'name': name, 'date': str(date or date_type.today()), 'bean': bean,
+                 'total_time': temp_curve[:, 0].max(), 'charge_temp': temp_curve[0, 1], 'drop_temp': temp_curve[-1, 1],
+                 'n_points': len(temp_curve), 'has_fan': bool(len(fan_curve))}
+        with self._lock:
+            self._write_index(pd.concat([self.index(), pd.DataFrame([entry])], ignore_index=True))
+        return roast_id
+
+    def load_curves(self, roast_id):
+        # 메모리 매핑된 (온도 곡선, 팬 곡선). 팬이 없으면 (0, 2) 배열
+        temp_curve = np.load(self._curve_path(roast_id, 'temp'), mmap_mode='r')
+        fan_path = self._curve_path(roast_id, 'fan')
+        fan_curve = np.load(fan_path, mmap_mode='r') if os.path.exists(fan_path) else np.zeros((0, 2))
+        return temp_curve, fan_curve
+
+    def load(self, roast_id):
+        # 저장된 곡선 → (온도 프로파일, 팬 프로파일) DataFrame
+        temp_curve, fan_curve = self.load_curves(roast_id)
+        return profile_from_arrays(temp_curve[:, 0], temp_curve[:, 1], TEMP_COL), profile_from_arrays(fan_curve[:, 0], fan_curve[:, 1], FAN_COL)
+
+    def delete(self, roast_id):
+        with self._lock:
+            index = self.index()
+            self._write_index(index[index['roast_id'] != roast_id].reset_index(drop=True))
+        for kind in ('temp', 'fan'):
+            path = self._curve_path(roast_id, kind)
+            if os.path.exists(path): os.remove(path)
@@ -0,0 +1,130 @@
+"""온도/ROR/팬 그래프 생성 (Streamlit 의존성 없음).
+
+트레이스마다 현재 X축 범위만 잘라 Largest-Triangle-Three-Buckets(LTTB)로 pixel_budget 개 이하로 줄이고,
+전체 포인트가 많으면 SVG 대신 WebGL(Scattergl)로 그린다. trace_cache 를 넘기면 내용이 같은 트레이스는
+다시 자르거나 줄이지 않고 재사용한다.
+"""
+import numpy as np
+from plotly.subplots import make_subplots
+
+from profile_engine import TEMP_COL, FAN_COL, CUMULATIVE_COL, ROR_COL, ROR_COLUMNS
+
+RENDER_MODES = ('auto', 'svg', 'webgl')
+WEBGL_POINT_THRESHOLD = 2000
+DEFAULT_PIXEL_BUDGET = 1000
+DEFAULT_AXIS_RANGES = {'x': [0, 360], 'y': [85, 235], 'y2': [0, 0.75]}
+
+
+# --- 다운샘플링 ---
+def lttb(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: 처음/끝 포인트를 유지하고 버킷마다 삼각형 넓이가 가장 큰 포인트 선택
+    n = len(x)
+    if n_out >= n or n_out < 3: return x, y
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int); selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area)); selected[i + 1] = a
+    return x[selected], y[selected]
+
+def window_slice(x, x_range):
+    # x_range 안의 포인트와 양쪽 바깥 포인트 하나씩 (선이 축 끝까지 이어지도록)
+    start = max(int(np.searchsorted(x, x_range[0], side='left')) - 1, 0)
+    end = min(int(np.searchsorted(x, x_range[1], side='right')) + 1, len(x))
+    return slice(start, end)
+
+def decimate(x, y, x_range, pixel_budget):
+    # 반환: (x, y, 줄였는지 여부)
+    window = window_slice(x, x_range)
+    x, y = x[window], y[window]
+    if len(x) <= pixel_budget: return x, y, False
+    x, y = lttb(x, y, pixel_budget)
+    return x, y, True
+
+
+# --- 트레이스 ---
+def _trace_data(df, value_col, x_range, pixel_budget, skip_first=False):
+    valid_df = df.dropna(subset=[CUMULATIVE_COL, TEMP_COL if value_col in ROR_COLUMNS else value_col])
+    if len(valid_df) <= 1: return None
+    if skip_first: valid_df = valid_df.iloc[1:]
+    return decimate(valid_df[CUMULATIVE_COL].to_numpy(dtype=float), valid_df[value_col].to_numpy(dtype=float), x_range, pixel_budget)
+
+def _trace(x, y, decimated, use_gl, mode, **kwargs):
+    if decimated: mode = 'lines'
+    return dict(type='scattergl' if use_gl else 'scatter', x=x, y=y, mode=mode, **kwargs)
+
+def profile_trace_data(df, fan_df, x_range, pixel_budget, with_fan, trace_cache=None, keys=(None, None), ror_col=ROR_COL):
+    # 반환: [(종류, x, y, 줄였는지 여부)] — 종류는 'temp', 'ror', 'fan'
+    def cached(kind, key, compute):
+        if trace_cache is None or key is None: return compute()
+        cache_key = (key, kind, tuple(x_range), pixel_budget)
+        data = trace_cache.get(cache_key)
+        if data is None:
+            data = compute(); trace_cache.put(cache_key, data if data is not None else False)
+        return data or None
+    temp_key, fan_key = keys
+    result = []
+    if df is not None:
+        temp = cached('temp', temp_key, lambda: _trace_data(df, TEMP_COL, x_range, pixel_budget))
+        if temp is not None:
+            result.append(('temp', *temp))
+            result.append(('ror', *cached(f'ror:{ror_col}', temp_key, lambda: _trace_data(df, ror_col, x_range, pixel_budget, skip_first=True))))
+    if with_fan and fan_df is not None:
+        fan = cached('fan', fan_key, lambda: _trace_data(fan_df, FAN_COL, x_range, pixel_budget))
+        if fan is not None: result.append(('fan', *fan))
+    return result
+
+def has_fan_data(names, fan_profiles):
+    return any(fan_profiles.get(name) is not None and not fan_profiles[name].dropna(subset=[FAN_COL]).empty for name in names)
+
+
+# --- 그래프 ---
+def build_profile_figure(profiles, fan_profiles, names, color_map, axis_ranges=None, render_mode='auto', pixel_budget=DEFAULT_PIXEL_BUDGET, trace_cache=None, profile_keys=None, ror_col=ROR_COL):
+    axis_ranges = axis_ranges or DEFAULT_AXIS_RANGES
+    profile_keys = profile_keys or {}
+    fan_data_exists = has_fan_data(names, fan_profiles)
+
+    rows = 2 if fan_data_exists else 1
+    row_heights = [0.7, 0.3] if fan_data_exists else [1]
+    specs = [[{"secondary_y": True}]]
+    if fan_data_exists:
+        specs.append([{"secondary_y": False}])
+    fig = make_subplots(rows=rows, cols=1, shared_xaxes=True, row_heights=row_heights, vertical_spacing=0.05, specs=specs)
+
+    trace_data = {}
+    for name in names:
+        if color_map.get(name) is None: continue
+        trace_data[name] = profile_trace_data(profiles.get(name), fan_profiles.get(name), axis_ranges['x'], pixel_budget, fan_data_exists, trace_cache, profile_keys.get(name, (None, None)), ror_col)
+    total_points = sum(len(x) for data in trace_data.values() for _, x, _, _ in data)
+    use_gl = render_mode == 'webgl' or (render_mode == 'auto' and total_points > WEBGL_POINT_THRESHOLD)
+
+    for name, data in trace_data.items():
+        color = color_map[name]
+        for kind, x, y, decimated in data:
+            if kind == 'temp':
+                fig.add_trace(_trace(x, y, decimated, use_gl, 'lines+markers', name=name, line=dict(color=color), legendgroup=name), row=1, col=1, secondary_y=False)
+            elif kind == 'ror':
+                fig.add_trace(_trace(x, y, decimated, use_gl, 'lines', name=f'{name} ROR', line=dict(color=color, dash='dot'), legendgroup=name, showlegend=False), row=1, col=1, secondary_y=True)
+            else:
+                fig.add_trace(_trace(x, y, decimated, use_gl, 'lines+markers', name=f'{name} Fan', line=dict(color=color, dash='solid'), legendgroup=name, showlegend=False), row=2, col=1)
+
+    fig.update_layout(height=900, legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    if fan_data_exists:
+        fig.update_xaxes(range=axis_ranges['x'], showticklabels=False, dtick=60, row=1, col=1)
+        fig.update_xaxes(range=axis_ranges['x'], title_text='시간 (초)', dtick=60, row=2, col=1)
+        fig.update_yaxes(title_text="팬 (%)", range=[60, 90], row=2, col=1)
+    else:
+        fig.update_xaxes(range=axis_ranges['x'], title_text='시간 (초)', showticklabels=True, dtick=60, row=1, col=1)
+    fig.update_yaxes(title_text="온도 (°C)", range=axis_ranges['y'], dtick=10, row=1, col=1, secondary_y=False)
+    fig.update_yaxes(title_text="ROR (℃/sec)", range=axis_ranges['y2'], showgrid=False, row=1, col=1, secondary_y=True)
+    return fig
+
+def set_time_marker(fig, selected_time):
+    # 선택 시간 세로선만 교체
+    fig.layout.shapes = []
+    fig.add_vline(x=selected_time, line_width=1, line_dash="dash", line_color="grey")
+    return fig
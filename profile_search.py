@@ -0,0 +1,133 @@
+"""저장된 로스팅 유사도 검색 (Streamlit 의존성 없음).
+
+온도 곡선을 공통 시간축(SEARCH_STEP 초 간격, SEARCH_HORIZON 초까지)으로 리샘플링하고 그 기울기(ROR)를 붙여
+특징 벡터를 만든다. 벡터와 PCA 투영을 라이브러리 폴더의 search_index.npz 에 미리 저장해 두고, 질의는
+투영 공간에서 후보를 고른 뒤 원래 벡터로 다시 정렬한다. 필요하면 상위 k개만 DTW 거리로 재정렬한다.
+포인트가 부족해 특징 벡터를 만들 수 없는 로스팅은 건너뛴 목록(skipped_ids)에 남겨 다시 읽지 않는다.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from profile_engine import TEMP_COL, CUMULATIVE_COL
+
+SEARCH_HORIZON = 900
+SEARCH_STEP = 5
+ROR_WEIGHT = 100  # ROR(℃/sec) 을 온도와 비슷한 크기로 맞추는 가중치
+PCA_DIMS = 16
+CANDIDATE_FACTOR = 20
+REFIT_GROWTH = 0.1  # 마지막 PCA 계산 때보다 벡터 수가 이 비율 이상 바뀌면 다시 계산
+
+SEARCH_GRID = np.arange(0, SEARCH_HORIZON + SEARCH_STEP, SEARCH_STEP, dtype=float)
+
+
+def curve_features(times, temps):
+    # (누적 시간, 온도) → [온도 곡선, ROR 곡선 × ROR_WEIGHT]. 로스팅이 끝난 뒤는 마지막 값 유지
+    times, temps = np.asarray(times, dtype=float), np.asarray(temps, dtype=float)
+    valid = ~(np.isnan(times) | np.isnan(temps))
+    times, temps = times[valid], temps[valid]
+    if len(times) < 2: raise ValueError("온도 포인트가 2개 이상 필요합니다.")
+    order = np.argsort(times, kind='stable')
+    temp_curve = np.interp(SEARCH_GRID, times[order], temps[order])
+    ror_curve = np.gradient(temp_curve, SEARCH_STEP)
+    ror_curve[SEARCH_GRID > times.max()] = 0
+    return np.concatenate([temp_curve, ror_curve * ROR_WEIGHT]).astype(np.float32)
+
+def profile_features(profile_df):
+    valid_df = profile_df.dropna(subset=[CUMULATIVE_COL, TEMP_COL])
+    return curve_features(valid_df[CUMULATIVE_COL], valid_df[TEMP_COL])
+
+def dtw_distance(a, b):
+    # 반대각선 단위로 벡터화한 DTW (절대값 비용)
+    n, m = len(a), len(b)
+    cost = np.abs(np.asarray(a, dtype=float)[:, None] - np.asarray(b, dtype=float)[None, :])
+    acc = np.full((n + 1, m + 1), np.inf); acc[0, 0] = 0
+    for diagonal in range(2, n + m + 1):
+        i = np.arange(max(1, diagonal - m), min(n, diagonal - 1) + 1); j = diagonal - i
+        acc[i, j] = cost[i - 1, j - 1] + np.minimum(np.minimum(acc[i - 1, j], acc[i, j - 1]), acc[i - 1, j - 1])
+    return acc[n, m]
+
+def _squared_distances(matrix, vector):
+    return np.einsum('ij,ij->i', matrix, matrix) - 2 * matrix @ vector + vector @ vector
+
+
+class RoastSearchIndex:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.ids = self.skipped_ids = np.zeros(0, dtype=str)
+        self.vectors = np.zeros((0, len(SEARCH_GRID) * 2), dtype=np.float32)
+        self.mean = self.components = self.projected = None
+        self.fitted_size = 0
+        if os.path.exists(path):
+            with np.load(path) as data:
+                self.ids, self.vectors = data['ids'], data['vectors']
+                if 'skipped_ids' in data: self.skipped_ids = data['skipped_ids']
+                if 'components' in data:
+                    self.mean, self.components, self.projected = data['mean'], data['components'], data['projected']
+                    self.fitted_size = int(data['fitted_size']) if 'fitted_size' in data else len(self.vectors)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _save(self):
+        arrays = {'ids': self.ids, 'vectors': self.vectors, 'skipped_ids': self.skipped_ids}
+        if self.components is not None:
+            arrays.update(mean=self.mean, components=self.components, projected=self.projected, fitted_size=self.fitted_size)
+        tmp_path = f"{self.path}.tmp.npz"
+        np.savez(tmp_path, **arrays); os.replace(tmp_path, self.path)
+
+    def _fit(self):
+        # 벡터 수가 충분하고 마지막 PCA 계산 이후 많이 바뀌었을 때만 다시 계산, 아니면 기존 축으로 투영만
+        if len(self.vectors) <= PCA_DIMS:
+            self.mean = self.components = self.projected = None; self.fitted_size = 0; return
+        if self.components is None or abs(len(self.vectors) - self.fitted_size) >= REFIT_GROWTH * self.fitted_size:
+            self.mean = self.vectors.mean(axis=0)
+            _, _, vt = np.linalg.svd(self.vectors - self.mean, full_matrices=False)
+            self.components = vt[:PCA_DIMS].T.astype(np.float32)
+            self.fitted_size = len(self.vectors)
+        self.projected = ((self.vectors - self.mean) @ self.components).astype(np.float32)
+
+    def sync(self, library):
+        # 라이브러리 인덱스와 맞춘다: 삭제된 로스팅은 빼고, 새 로스팅만 곡선을 읽어 벡터 추가. 반환: 추가된 수
+        roast_ids = library.index()['roast_id'].to_numpy(dtype=str)
+        with self._lock:
+            keep = np.isin(self.ids, roast_ids)
+            skipped_ids = self.skipped_ids[np.isin(self.skipped_ids, roast_ids)]
+            new_ids = roast_ids[~np.isin(roast_ids, self.ids) & ~np.isin(roast_ids, skipped_ids)]
+            if keep.all() and len(skipped_ids) == len(self.skipped_ids) and not len(new_ids): return 0
+            added_ids, new_vectors, failed_ids = [], [], []
+            for roast_id in new_ids:
+                try:
+                    new_vectors.append(curve_features(*library.load_curves(roast_id)[0].T)); added_ids.append(roast_id)
+                except (ValueError, OSError):
+                    failed_ids.append(roast_id)
+            self.ids = np.concatenate([self.ids[keep], np.array(added_ids, dtype=str)])
+            self.skipped_ids = np.concatenate([skipped_ids, np.array(failed_ids, dtype=str)])
+            self.vectors = np.vstack([self.vectors[keep], *new_vectors]) if new_vectors else self.vectors[keep]
+            self._fit()
+            self._save()
+        return len(added_ids)
+
+    def query(self, vector, k=5, rerank_dtw=False):
+        # 반환: roast_id, distance (특징 벡터 L2), rerank_dtw 이면 dtw_distance 로 정렬
+        if not len(self.ids): return pd.DataFrame(columns=['roast_id', 'distance'])
+        vector = np.asarray(vector, dtype=np.float32)
+        k = min(k, len(self.ids))
+        if self.components is not None:
+            n_candidates = min(k * CANDIDATE_FACTOR, len(self.ids))
+            coarse = _squared_distances(self.projected, (vector - self.mean) @ self.components)
+            candidates = np.argpartition(coarse, n_candidates - 1)[:n_candidates]
+        else:
+            candidates = np.arange(len(self.ids))
+        # 후보만 차이 벡터로 직접 계산 (전개식은 float32 에서 자릿수 손실이 커서 정확한 정렬에 쓰지 않음)
+        exact = np.linalg.norm(self.vectors[candidates].astype(float) - vector, axis=1)
+        top = np.argsort(exact)[:k]
+        results = pd.DataFrame({'roast_id': self.ids[candidates[top]], 'distance': exact[top]})
+        if rerank_dtw:
+            n_grid = len(SEARCH_GRID)
+            results['dtw_distance'] = [dtw_distance(vector[:n_grid], self.vectors[i, :n_grid]) for i in candidates[top]]
+            results = results.sort_values('dtw_distance', kind='stable').reset_index(drop=True)
+        return results
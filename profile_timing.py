@@ -0,0 +1,65 @@
+"""단계별 실행 시간/최대 메모리 측정 (Streamlit 의존성 없음).
+
+    timer = StageTimer(enabled=True, track_memory=True)
+    with timer.stage('그래프 생성'):
+        ...
+    timer.to_frame()
+
+peak_mb 는 단계 시작 시점보다 늘어난 최대 메모리다. tracemalloc 은 프로세스 전체에 하나이므로 이 값도
+프로세스 전체 기준이다: 같은 시간에 다른 스레드(다른 Streamlit 세션)가 할당한 메모리가 섞이고, 동시에 측정 중인
+단계끼리는 서로의 최대값을 초기화한다. 같은 이유로 단계는 중첩하지 않는다고 가정한다. 모든 사용자에게 할당 비용이
+붙으므로 서버에서는 환경 변수 IKAWA_TRACK_MEMORY=1 일 때만 켜고(TRACK_MEMORY), 켜면 멈추지 않는다.
+끝난 단계는 'ikawa.timing' 로거에 DEBUG 로 남는다.
+"""
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+logger = logging.getLogger('ikawa.timing')
+TRACK_MEMORY = os.environ.get('IKAWA_TRACK_MEMORY', '') not in ('', '0')
+
+
+class StageTimer:
+    def __init__(self, enabled=True, track_memory=False):
+        self.enabled, self.track_memory = enabled, track_memory
+        self.records = []
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield; return
+        if self.track_memory:
+            if not tracemalloc.is_tracing(): tracemalloc.start()
+            tracemalloc.reset_peak(); start_memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {'stage': name, 'seconds': time.perf_counter() - start, 'peak_mb': (tracemalloc.get_traced_memory()[1] - start_memory) / 2**20 if self.track_memory else None}
+            self.records.append(record)
+            logger.debug("%s: %.1f ms%s", name, record['seconds'] * 1000, f", peak {record['peak_mb']:.1f} MB" if self.track_memory else "")
+
+    def to_frame(self):
+        return pd.DataFrame(self.records, columns=['stage', 'seconds', 'peak_mb'])
+
+    def summary(self):
+        # 같은 이름의 단계를 합친 표 (호출 수, 총/최대 시간, 최대 메모리)
+        frame = self.to_frame()
+        return frame.groupby('stage', sort=False).agg(calls=('seconds', 'size'), total_seconds=('seconds', 'sum'), max_seconds=('seconds', 'max'), peak_mb=('peak_mb', 'max')).reset_index()
+
+
+def stop_memory_tracking():
+    # 단독 실행(벤치마크 등)에서만 사용. Streamlit 서버에서는 다른 세션의 측정까지 멈춘다
+    if tracemalloc.is_tracing(): tracemalloc.stop()
+
+def enable_log_output(level=logging.DEBUG):
+    # 'ikawa.timing' 로그를 표준 에러로 출력 (여러 번 호출해도 핸들러는 하나)
+    logger.setLevel(level)
+    if not any(getattr(handler, '_ikawa_timing', False) for handler in logger.handlers):
+        handler = logging.StreamHandler(); handler._ikawa_timing = True
+        handler.setFormatter(logging.Formatter("%(asctime)s [timing] %(message)s"))
+        logger.addHandler(handler)
@@ -0,0 +1,172 @@
+"""profile_engine: 일괄 동기화/ROR 이 기존 앱의 프로파일 단위 함수와 같은지, 시간 그리드, 스무딩 ROR."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from profile_engine import TIME_INPUT_MODE, INTERVAL_INPUT_MODE, TEMP_COL, FAN_COL, MIN_COL, SEC_COL, INTERVAL_COL, CUMULATIVE_COL, ROR_COL
+from profile_engine import ROR_WINDOW_COL, ROR_SAVGOL_COL, ROR_EMA_COL, EMA_TAU_SECONDS
+from profile_engine import sync_profiles, calculate_ror_batch, build_time_grid, grid_value, profile_from_arrays, point_analysis
+from profile_engine import SmoothedRor, smoothed_ror, update_smoothed_ror, add_smoothed_ror
+
+MODES = (TIME_INPUT_MODE, INTERVAL_INPUT_MODE)
+
+
+# --- 기존 앱의 함수 (엔진 도입 전, 비교 기준) ---
+def reference_sync(df, primary_input_mode, value_col, with_ror):
+    df = df.reset_index(drop=True); df['Point'] = df.index
+    if df[value_col].isnull().all(): return df
+    last_valid_index = df[value_col].last_valid_index()
+    if last_valid_index is None: return df
+    calc_df = df.loc[0:last_valid_index].copy()
+    if primary_input_mode == '시간 입력':
+        calc_df['누적 시간 (초)'] = calc_df['분'].fillna(0) * 60 + calc_df['초'].fillna(0)
+        calc_df['구간 시간 (초)'] = calc_df['누적 시간 (초)'].diff().shift(-1)
+    elif primary_input_mode == '구간 입력':
+        cumulative_seconds = calc_df['구간 시간 (초)'].fillna(0).cumsum()
+        calc_df['누적 시간 (초)'] = np.concatenate(([0], cumulative_seconds[:-1].values))
+        calc_df['분'] = (calc_df['누적 시간 (초)'] // 60).astype(int)
+        calc_df['초'] = (calc_df['누적 시간 (초)'] % 60).astype(int)
+    if with_ror:
+        delta_temp = calc_df['온도'].diff(); delta_time = calc_df['누적 시간 (초)'].diff()
+        calc_df['ROR (℃/sec)'] = (delta_temp / delta_time).replace([np.inf, -np.inf], 0).fillna(0)
+    df.update(calc_df)
+    return df
+
+def reference_calculate_ror(df):
+    if df['온도'].isnull().all(): return df
+    last_valid_index = df['온도'].last_valid_index()
+    if last_valid_index is None: return df
+    calc_df = df.loc[0:last_valid_index].copy()
+    delta_temp = calc_df['온도'].diff(); delta_time = calc_df['누적 시간 (초)'].diff()
+    calc_df['ROR (℃/sec)'] = (delta_temp / delta_time).replace([np.inf, -np.inf], 0).fillna(0); df.update(calc_df)
+    return df
+
+
+def random_editor_df(rng, value_col):
+    # 편집기에서 나올 법한 데이터: 길이 제각각, 값/분/초 중간에 빈칸, 구간 시간 0 포함
+    n_rows = int(rng.integers(1, 30))
+    n_values = int(rng.integers(0, n_rows + 1))
+    values = np.full(n_rows, np.nan); values[:n_values] = rng.uniform(60, 230, n_values)
+    if n_values > 2 and rng.random() < 0.4: values[rng.integers(0, n_values)] = np.nan
+    minutes = np.sort(rng.integers(0, 12, n_rows)).astype(float)
+    seconds = rng.integers(0, 60, n_rows).astype(float)
+    minutes[rng.random(n_rows) < 0.1] = np.nan; seconds[rng.random(n_rows) < 0.1] = np.nan
+    data = {'Point': np.arange(n_rows), value_col: values, MIN_COL: minutes, SEC_COL: seconds,
+            INTERVAL_COL: rng.integers(0, 40, n_rows).astype(float), CUMULATIVE_COL: np.nan}
+    if value_col == TEMP_COL: data[ROR_COL] = np.nan
+    df = pd.DataFrame(data); df.loc[0, CUMULATIVE_COL] = 0
+    return df
+
+def assert_same_values(expected, actual):
+    np.testing.assert_allclose(actual[expected.columns].to_numpy(dtype=float), expected.to_numpy(dtype=float), rtol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize('seed', range(40))
+@pytest.mark.parametrize('value_col', [TEMP_COL, FAN_COL])
+def test_sync_profiles_matches_reference(seed, value_col):
+    rng = np.random.default_rng(seed)
+    dfs = [random_editor_df(rng, value_col) for _ in range(int(rng.integers(1, 6)))]
+    modes = [MODES[i] for i in rng.integers(0, 2, len(dfs))]
+    with_ror = value_col == TEMP_COL
+    actual = sync_profiles(dfs, modes, value_col, with_ror=with_ror)
+    for df, mode, result in zip(dfs, modes, actual):
+        assert_same_values(reference_sync(df.copy(), mode, value_col, with_ror), result)
+
+@pytest.mark.parametrize('seed', range(40))
+def test_calculate_ror_batch_matches_reference(seed):
+    rng = np.random.default_rng(seed)
+    dfs = [random_editor_df(rng, TEMP_COL) for _ in range(int(rng.integers(1, 6)))]
+    synced = sync_profiles(dfs, [TIME_INPUT_MODE] * len(dfs))
+    for df, result in zip(synced, calculate_ror_batch(synced)):
+        assert_same_values(reference_calculate_ror(df.copy()), result)
+
+def test_sync_profiles_does_not_modify_input():
+    df = random_editor_df(np.random.default_rng(0), TEMP_COL)
+    before = df.copy()
+    sync_profiles([df], [TIME_INPUT_MODE])
+    pd.testing.assert_frame_equal(df, before)
+
+def test_empty_batch():
+    assert sync_profiles([], []) == [] and calculate_ror_batch([]) == []
+
+def test_build_time_grid_end_times():
+    profiles = {'a': profile_from_arrays([0, 100, 250], [90, 150, 200]), 'b': profile_from_arrays([0, 60], [90, 120]), 'empty': profile_from_arrays([], [])}
+    grid = build_time_grid(profiles, {'a': profile_from_arrays([0, 300], [70, 80], FAN_COL)})
+    assert grid['end_time']['a'] == 250 and grid['end_time']['b'] == 60 and np.isnan(grid['end_time']['empty'])
+    assert grid['max_time'] == 300
+    assert grid_value(grid, TEMP_COL, 'a', 50) == 120 and np.isnan(grid_value(grid, TEMP_COL, 'b', 61))
+
+
+# --- 스무딩 ROR ---
+def random_roast(rng, n=400, gap_at=None):
+    # 불규칙한 간격(0.2~3초)의 로스팅 곡선. gap_at 이 있으면 그 위치에 아주 긴 공백
+    steps = rng.uniform(0.2, 3, n); steps[0] = 0
+    if gap_at is not None: steps[gap_at] = 1000 * EMA_TAU_SECONDS
+    times = np.cumsum(steps)
+    return times, 200 - 110 * np.exp(-times / 240) + rng.normal(0, 0.3, n)
+
+def reference_smoothed_ror(times, temps, window=30, savgol_window=30, tau=EMA_TAU_SECONDS):
+    raw = np.zeros(len(times)); raw[1:] = np.diff(temps) / np.diff(times)
+    window_ror, savgol, ema = np.zeros(len(times)), np.zeros(len(times)), np.zeros(len(times))
+    for i, t in enumerate(times):
+        j = max(np.searchsorted(times, t - window, side='right') - 1, 0)
+        window_ror[i] = (temps[i] - temps[j]) / (t - times[j]) if t > times[j] else 0
+        inside = np.abs(times - t) <= savgol_window / 2
+        savgol[i] = np.polyfit(times[inside], temps[inside], 1)[0] if inside.sum() >= 2 else raw[i]
+        ema[i] = raw[0] if i == 0 else ema[i - 1] + (1 - np.exp(-(t - times[i - 1]) / tau)) * (raw[i] - ema[i - 1])
+    return {ROR_COL: raw, ROR_WINDOW_COL: window_ror, ROR_SAVGOL_COL: savgol, ROR_EMA_COL: ema}
+
+@pytest.mark.parametrize('gap_at', [None, 200])
+def test_smoothed_ror_matches_reference(gap_at):
+    times, temps = random_roast(np.random.default_rng(3), gap_at=gap_at)
+    expected, actual = reference_smoothed_ror(times, temps), smoothed_ror(times, temps)
+    for col in expected:
+        np.testing.assert_allclose(actual[col], expected[col], rtol=1e-6, atol=1e-9, err_msg=col)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_chunked_append_matches_single_pass(seed):
+    rng = np.random.default_rng(seed)
+    times, temps = random_roast(rng, n=1500, gap_at=700 if seed % 2 else None)
+    expected = smoothed_ror(times, temps)
+    state = SmoothedRor()
+    bounds = np.unique(np.concatenate([[0, 1, 2], rng.integers(0, len(times), 30), [len(times)]]))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        state.append(times[start:end], temps[start:end])
+    for col in expected:
+        np.testing.assert_allclose(state.ror[col], expected[col], rtol=1e-9, atol=1e-8, err_msg=col)  # 누적합 순서 차이
+
+def test_append_rejects_earlier_times():
+    state = SmoothedRor(); state.append([0, 1, 2], [90, 91, 92])
+    with pytest.raises(ValueError): state.append([1.5], [93])
+
+def test_update_smoothed_ror_reuses_state_only_for_appended_samples():
+    times, temps = random_roast(np.random.default_rng(4))
+    state = update_smoothed_ror(None, times[:300], temps[:300])
+    assert update_smoothed_ror(state, times, temps) is state and len(state) == len(times)
+    edited = temps.copy(); edited[10] += 1
+    fresh = update_smoothed_ror(state, times, edited)
+    assert fresh is not state
+    np.testing.assert_allclose(fresh.ror[ROR_SAVGOL_COL], smoothed_ror(times, edited)[ROR_SAVGOL_COL])
+
+def test_add_smoothed_ror_with_states_matches_full_computation():
+    times, temps = random_roast(np.random.default_rng(5))
+    short_df, full_df = profile_from_arrays(times[:250], temps[:250]), profile_from_arrays(times, temps)
+    states = [None]
+    add_smoothed_ror([short_df], states)
+    first_state = states[0]
+    incremental = add_smoothed_ror([full_df], states)[0]
+    assert states[0] is first_state
+    for col in (ROR_WINDOW_COL, ROR_SAVGOL_COL, ROR_EMA_COL):
+        np.testing.assert_allclose(incremental[col], add_smoothed_ror([full_df])[0][col], rtol=1e-9, atol=1e-8)
+
+@pytest.mark.parametrize('ror_col', [ROR_COL, ROR_SAVGOL_COL])
+def test_point_analysis_interpolates_selected_ror(ror_col):
+    times = np.arange(0, 300, 0.5)
+    temps = 90 + 0.3 * times + np.random.default_rng(6).normal(0, 0.3, len(times))
+    profile_df = add_smoothed_ror([profile_from_arrays(times, temps)])[0]
+    fan_df = profile_from_arrays([0, 149.5, 150, 299.5], [70, 70, 80, 80], FAN_COL)
+    temp_points, fan_points = point_analysis(profile_df, fan_df, ror_col)
+    assert temp_points[FAN_COL].tolist()[:2] == [70, 70]
+    expected = np.interp(fan_df[CUMULATIVE_COL], times, profile_df[ror_col]).round(3)
+    np.testing.assert_allclose(fan_points[ror_col], expected)
+    if ror_col == ROR_SAVGOL_COL: np.testing.assert_allclose(fan_points[ror_col], 0.3, atol=0.05)
@@ -0,0 +1,71 @@
+"""로그 가져오기: 컬럼 인식, 시간 파싱, 단위 변환, 잘못된 로그 처리."""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from profile_engine import TEMP_COL, FAN_COL, CUMULATIVE_COL
+from profile_import import resolve_columns, read_log_arrays, read_roast_log, read_roast_logs
+
+
+def csv(text):
+    return io.StringIO(text)
+
+@pytest.mark.parametrize('text, time_unit', [
+    ("time,temp\n0,90\n2,95\n60,120\n", 's'),
+    ("time,temp\n0,90\n2000,95\n60000,120\n", 'ms'),
+    ("time,temp\n0,90\n0.0333333333333,95\n1,120\n", 'min'),
+    ("time,temp\n0:00,90\n0:02,95\n1:00,120\n", 's'),
+    ("time,temp\n2025-10-13 10:00:01,90\n2025-10-13 10:00:03,95\n2025-10-13 10:01:01,120\n", 's'),
+    ("time,temp\n2025-10-13T10:00:01+09:00,90\n2025-10-13T10:00:03+09:00,95\n2025-10-13T10:01:01+09:00,120\n", 's'),
+    ("time,temp\n10,90\n12,95\n70,120\n", 's'),  # 첫 샘플 기준 0초
+])
+def test_time_parsing(text, time_unit):
+    times, temps, _ = read_log_arrays(csv(text), time_unit=time_unit)
+    np.testing.assert_allclose(times, [0, 2, 60], atol=1e-9)
+    np.testing.assert_allclose(temps, [90, 95, 120])
+
+def test_datetime64_column(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'log.parquet'
+    pd.DataFrame({'time': pd.date_range('2025-10-13 10:00', periods=3, freq='2s'), 'temp': [90, 95, 100.]}).to_parquet(path)
+    np.testing.assert_allclose(read_log_arrays(str(path))[0], [0, 2, 4])
+
+def test_unsorted_and_duplicate_timestamps_keep_last_sample():
+    times, temps, _ = read_log_arrays(csv("time,temp\n2,95\n0,90\n2,96\n1,bad\n"))
+    np.testing.assert_allclose(times, [0, 1, 2])
+    np.testing.assert_allclose(temps, [90, np.nan, 96])
+
+def test_fahrenheit_and_column_aliases():
+    times, temps, fans = read_log_arrays(csv("Elapsed,Bean Temp,Fan Set\n0,212,70\n1,392,80\n"), temp_unit='F')
+    np.testing.assert_allclose(temps, [100, 200]); np.testing.assert_allclose(fans, [70, 80])
+
+def test_chunked_read_matches_single_read():
+    text = "time,temp,fan\n" + "".join(f"{i * 0.5},{90 + i * 0.1},{70 + i // 50}\n" for i in range(1000))
+    for expected, actual in zip(read_log_arrays(csv(text)), read_log_arrays(csv(text), chunksize=97)):
+        np.testing.assert_array_equal(expected, actual)
+
+def test_read_roast_log_builds_synced_profiles():
+    profile_df, fan_df = read_roast_log(csv("time,temp,fan\n0,90,70\n1,92,70\n2,95,70\n3,99,80\n"))
+    np.testing.assert_allclose(profile_df[CUMULATIVE_COL], [0, 1, 2, 3])
+    assert profile_df[TEMP_COL].tolist() == [90, 92, 95, 99]
+    assert fan_df[FAN_COL].tolist() == [70, 70, 80]  # 같은 값이 이어지는 구간은 처음과 끝만
+
+@pytest.mark.parametrize('text, message', [
+    ("time,temp\nabc,90\nxyz,95\n", "시간 값"),
+    ("time,temp,fan\n0,n/a,-\n1,n/a,-\n", "숫자 값"),
+    ("foo,temp\n0,90\n", "시간 컬럼"),
+    ("time,foo\n0,90\n", "온도 또는 팬"),
+])
+def test_invalid_logs_raise(text, message):
+    with pytest.raises(ValueError, match=message):
+        read_roast_log(csv(text))
+
+def test_explicit_column_map():
+    assert resolve_columns(['t', 'bt', 'fan'], {'time': 't', 'temp': 'bt'}) == {'time': 't', 'temp': 'bt', 'fan': 'fan'}
+    with pytest.raises(ValueError): resolve_columns(['t', 'bt'], {'time': 'missing'})
+
+def test_read_roast_logs_reports_failures_in_order():
+    results = read_roast_logs([csv("time,temp\n0,90\n1,91\n"), csv("time,temp\nabc,90\n")])
+    assert isinstance(results[0], tuple) and isinstance(results[1], ValueError)
@@ -0,0 +1,79 @@
+"""그래프: LTTB 다운샘플링, X축 범위 자르기, SVG/WebGL 전환, 트레이스 캐시."""
+import numpy as np
+import pytest
+
+from profile_cache import ProfileCache
+from profile_engine import FAN_COL, profile_from_arrays
+from profile_plot import WEBGL_POINT_THRESHOLD, lttb, window_slice, decimate, build_profile_figure
+
+
+def reference_lttb(x, y, n_out):
+    # 같은 버킷 나누기로 포인트마다 삼각형 넓이를 직접 계산하는 느린 버전
+    n = len(x)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected, a = [0], 0
+    for i in range(n_out - 2):
+        next_bucket = range(edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = sum(x[j] for j in next_bucket) / len(next_bucket); avg_y = sum(y[j] for j in next_bucket) / len(next_bucket)
+        areas = [abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) for j in range(edges[i], edges[i + 1])]
+        a = edges[i] + int(np.argmax(areas)); selected.append(a)
+    return np.asarray(selected + [n - 1])
+
+@pytest.mark.parametrize('n, n_out', [(10, 3), (100, 10), (1000, 97), (5000, 1000)])
+def test_lttb_matches_reference(n, n_out):
+    rng = np.random.default_rng(n)
+    x, y = np.sort(rng.uniform(0, 600, n)), rng.normal(0, 1, n).cumsum()
+    out_x, out_y = lttb(x, y, n_out)
+    expected = reference_lttb(x, y, n_out)
+    assert len(out_x) == n_out
+    np.testing.assert_array_equal(out_x, x[expected]); np.testing.assert_array_equal(out_y, y[expected])
+
+def test_lttb_keeps_endpoints_and_spike():
+    x = np.arange(1000.); y = np.zeros(1000); y[437] = 50
+    out_x, out_y = lttb(x, y, 20)
+    assert out_x[0] == 0 and out_x[-1] == 999 and 437 in out_x and np.all(np.diff(out_x) > 0)
+
+def test_lttb_returns_input_when_nothing_to_drop():
+    x, y = np.arange(5.), np.arange(5.)
+    for n_out in (2, 5, 10):
+        assert lttb(x, y, n_out)[0] is x
+
+def test_window_slice_keeps_one_point_outside_each_side():
+    x = np.arange(0, 100, 10.)
+    assert x[window_slice(x, [25, 55])].tolist() == [20, 30, 40, 50, 60]
+    assert x[window_slice(x, [-5, 500])].tolist() == x.tolist()
+
+def test_decimate_respects_budget():
+    x = np.linspace(0, 600, 5000); y = np.sin(x)
+    out_x, _, decimated = decimate(x, y, [0, 300], 200)
+    assert decimated and len(out_x) == 200 and out_x[-1] >= 300
+    assert not decimate(x, y, [0, 1], 200)[2]
+
+
+def profiles(n_points):
+    times = np.linspace(0, 600, n_points)
+    profile_df = profile_from_arrays(times, 200 - 110 * np.exp(-times / 240))
+    fan_df = profile_from_arrays([0, 300, 600], [70, 80, 75], FAN_COL)
+    return {'a': profile_df}, {'a': fan_df}
+
+@pytest.mark.parametrize('n_points, trace_type', [(100, 'scatter'), (5000, 'scattergl')])
+def test_auto_render_mode(n_points, trace_type):
+    profile_map, fan_map = profiles(n_points)
+    fig = build_profile_figure(profile_map, fan_map, ['a'], {'a': 'red'}, {'x': [0, 600], 'y': [80, 240], 'y2': [0, 1]}, pixel_budget=WEBGL_POINT_THRESHOLD * 2)
+    assert {trace.type for trace in fig.data} == {trace_type}
+    assert len(fig.data) == 3  # 온도, ROR, 팬
+
+def test_pixel_budget_limits_trace_points():
+    profile_map, fan_map = profiles(20000)
+    fig = build_profile_figure(profile_map, fan_map, ['a'], {'a': 'red'}, pixel_budget=500)
+    assert max(len(trace.x) for trace in fig.data) <= 500
+
+def test_trace_cache_reuses_decimated_traces():
+    profile_map, fan_map = profiles(3000)
+    cache = ProfileCache()
+    args = (profile_map, fan_map, ['a'], {'a': 'red'})
+    first = build_profile_figure(*args, trace_cache=cache, profile_keys={'a': ('t', 'f')})
+    n_cached = len(cache)
+    second = build_profile_figure(*args, trace_cache=cache, profile_keys={'a': ('t', 'f')})
+    assert n_cached == 3 and len(cache) == 3
+    for a, b in zip(first.data, second.data): np.testing.assert_array_equal(a.y, b.y)
@@ -0,0 +1,69 @@
+"""유사도 검색: DTW, PCA 재계산 시점, 건너뛴 로스팅, 질의 결과."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from profile_engine import TEMP_COL, CUMULATIVE_COL
+from profile_library import ProfileLibrary
+from profile_search import PCA_DIMS, REFIT_GROWTH, RoastSearchIndex, dtw_distance, profile_features
+
+
+def reference_dtw(a, b):
+    acc = np.full((len(a) + 1, len(b) + 1), np.inf); acc[0, 0] = 0
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            acc[i, j] = abs(a[i - 1] - b[j - 1]) + min(acc[i - 1, j], acc[i, j - 1], acc[i - 1, j - 1])
+    return acc[-1, -1]
+
+@pytest.mark.parametrize('n, m', [(1, 1), (5, 9), (30, 17)])
+def test_dtw_matches_reference(n, m):
+    rng = np.random.default_rng(n * m)
+    a, b = rng.normal(size=n), rng.normal(size=m)
+    assert dtw_distance(a, b) == pytest.approx(reference_dtw(a, b))
+
+
+def roast(rng):
+    times = np.arange(0, 600, 10.)
+    return pd.DataFrame({TEMP_COL: 200 - 110 * np.exp(-times / rng.uniform(150, 300)), CUMULATIVE_COL: times})
+
+@pytest.fixture
+def library(tmp_path):
+    return ProfileLibrary(str(tmp_path / 'library'))
+
+def test_pca_refits_when_library_grows_one_roast_at_a_time(library, tmp_path):
+    rng = np.random.default_rng(0)
+    path = str(tmp_path / 'search_index.npz')
+    fitted_sizes = []
+    for i in range(60):
+        library.save(f'r{i}', roast(rng))
+        index = RoastSearchIndex(path); index.sync(library)
+        fitted_sizes.append(index.fitted_size)
+    refits = sorted(set(fitted_sizes) - {0})
+    assert refits[0] == PCA_DIMS + 1 and refits[-1] >= 60 * (1 - REFIT_GROWTH)
+    assert all(b - a >= REFIT_GROWTH * a for a, b in zip(refits, refits[1:]))
+
+def test_unusable_roasts_are_skipped_once(library, tmp_path):
+    rng = np.random.default_rng(1)
+    for i in range(3): library.save(f'r{i}', roast(rng))
+    broken_id = 'broken'
+    np.save(library._curve_path(broken_id, 'temp'), np.array([[0, 90.]]))
+    library._write_index(pd.concat([library.index(), pd.DataFrame([{'roast_id': broken_id, 'name': 'broken', 'n_points': 1}])], ignore_index=True))
+    path = str(tmp_path / 'search_index.npz')
+    index = RoastSearchIndex(path)
+    assert index.sync(library) == 3 and index.skipped_ids.tolist() == [broken_id]
+    assert RoastSearchIndex(path).sync(library) == 0
+    library.delete(broken_id)
+    index = RoastSearchIndex(path); index.sync(library)
+    assert index.skipped_ids.tolist() == [] and len(index) == 3
+
+def test_query_matches_brute_force(library, tmp_path):
+    rng = np.random.default_rng(2)
+    profiles = [roast(rng) for _ in range(80)]
+    ids = [library.save(f'r{i}', df) for i, df in enumerate(profiles)]
+    index = RoastSearchIndex(str(tmp_path / 'search_index.npz')); index.sync(library)
+    query = profile_features(roast(rng))
+    distances = np.array([np.linalg.norm(profile_features(df) - query) for df in profiles])
+    results = index.query(query, k=5)
+    assert results['roast_id'].tolist() == [ids[i] for i in np.argsort(distances)[:5]]
+    np.testing.assert_allclose(results['distance'], np.sort(distances)[:5], rtol=1e-4)
+    assert index.query(query, k=5, rerank_dtw=True)['dtw_distance'].is_monotonic_increasing